@@ -0,0 +1,115 @@
+"""
+Semantic answer cache: quotation-leak check and lookup micro-benchmark.
+
+Usage (from the repository root):
+
+    python -m benchmarks.answer_cache --entries 512 --lookups 20000
+
+1. Builds a caller's CALL CONTEXT from the real quotation shapes
+   (a single insurer quote and the aggregator's merged result, IDV
+   rendered as "₹4.2L – ₹4.5L") and checks that replies repeating
+   any of its figures, in any spelling, are never shareable, while
+   generic FAQ answers still are.
+2. Times SemanticAnswerCache.lookup() against a full cache.
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from core.prompt_builder import PromptBuilder
+from domains.insurance_agent.answer_cache import SemanticAnswerCache, is_shareable
+from domains.insurance_agent.quotation import StubInsurerAdapter, render_quotation
+
+
+# Replies that leak the quote above, and ones that must stay cacheable
+LEAKING_REPLIES = [
+    "The IDV comes to about 4.2L to 4.5L for this bike.",
+    "Your IDV is between 4.2 and 4.5 lakh.",
+    "The insured value is around ₹4.5L.",
+    "IDV: 4.2 L to 4.5 L.",
+    "It is roughly 4.5 lakh rupees.",
+    "You can choose from over 3,200 cashless garages.",
+    "The premium works out to 12,456 for the year.",
+]
+SHAREABLE_REPLIES = [
+    "IDV is the insured declared value, roughly the market value of your bike.",
+    "Zero depreciation covers the full cost of replaced parts.",
+    "A claim is usually settled within 7 days of the survey.",
+    "Engine protect covers damage from water ingress.",
+]
+
+
+def call_contexts() -> list:
+    """CALL CONTEXT conversations for the quote shapes the agent renders."""
+    adapters = [StubInsurerAdapter(name, latency=0) for name in ("InsurerA", "InsurerB")]
+    quotes = [adapter.fetch("MH12AB1234") for adapter in adapters]
+    single = {"registration_number": "MH12AB1234", **quotes[0], "premium": 12456,
+              "cashless_garages": 3200}
+    merged = {"registration_number": "MH12AB1234", "quotes": quotes, "unavailable": []}
+
+    builder = PromptBuilder("system prompt")
+    conversations = []
+    for quotation in (single, merged):
+        rendered = render_quotation(quotation)
+        assert rendered is not None, quotation
+        conversations.append(
+            builder.messages("Ravi", f"### QUOTATION DATA\n\n{rendered}")
+            + [HumanMessage(content="what is the IDV for this bike?")]
+        )
+    return conversations
+
+
+def check_safeguards() -> list:
+    failures = []
+    single, merged = call_contexts()
+
+    for reply in LEAKING_REPLIES:
+        if is_shareable(reply, single):
+            failures.append(f"leaked (single quote): {reply!r}")
+    for reply in LEAKING_REPLIES[:5]:
+        # Every insurer in the merged result carries the same IDV range
+        if is_shareable(reply, merged):
+            failures.append(f"leaked (merged quotes): {reply!r}")
+    for reply in SHAREABLE_REPLIES:
+        for conversation in (single, merged):
+            if not is_shareable(reply, conversation):
+                failures.append(f"over-blocked: {reply!r}")
+    return failures
+
+
+def bench_lookup(entries: int, lookups: int, dim: int = 384) -> float:
+    rng = np.random.default_rng(0)
+    cache = SemanticAnswerCache(threshold=0.93, max_entries=entries, ttl=3600)
+    for i in range(entries):
+        cache.store(rng.standard_normal(dim), "mid|quoted", f"answer {i}", 1.0)
+
+    queries = rng.standard_normal((lookups, dim))
+    start = time.perf_counter()
+    for query in queries:
+        cache.lookup(query, "mid|quoted")
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--entries", type=int, default=512)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    failures = check_safeguards()
+    for failure in failures:
+        print("❌", failure)
+    if failures:
+        sys.exit(1)
+    print(f"✅ Quotation safeguards: {len(LEAKING_REPLIES)} leaking replies blocked, "
+          f"{len(SHAREABLE_REPLIES)} generic replies shareable")
+
+    per_lookup = bench_lookup(args.entries, args.lookups)
+    print(f"lookup  {args.entries} entries  {per_lookup:.2f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Output-contract parser: corpus check, fuzzing and micro-benchmark.
+
+Usage (from the repository root):
+
+    python -m benchmarks.contract_parser --fuzz 5000 --iterations 20000
+
+1. Every reply in benchmarks/data/contract_corpus.jsonl must parse to
+   its expected (speech, call_status, language).
+2. Fuzzing mutates corpus replies (whitespace, fences, truncation, random
+   token splits) and checks that parsing never raises, that a parsed
+   trailer never leaks into speech, and that the streaming parser
+   agrees with the batch parser.
+3. The micro-benchmark times parse_contract() against the per-turn
+   regex + json.loads + re.sub sequence it replaced.
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+
+from core.contract import parse_contract
+from core.streaming import ContractStreamParser
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "contract_corpus.jsonl")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# =========================
+# Legacy path (for comparison)
+# =========================
+LEGACY_MATCH = re.compile(r'\{.*"call_status"\s*:\s*"(END|ONGOING)".*("language"\s*:\s*"[^"]+")?.*\}')
+LEGACY_STRIP = re.compile(r'\{.*"call_status".*\}$')
+
+
+def legacy_parse(text: str):
+    call_status, language = "ONGOING", None
+    match = LEGACY_MATCH.search(text)
+    if match:
+        try:
+            payload = json.loads(match.group())
+            call_status = payload.get("call_status", "ONGOING")
+            language = payload.get("language")
+        except Exception:
+            pass
+    return LEGACY_STRIP.sub("", text).strip(), call_status, language
+
+
+# =========================
+# Checks
+# =========================
+def words(text: str) -> str:
+    return " ".join(text.split())
+
+
+def stream_parse(text: str, rng: random.Random):
+    parser = ContractStreamParser()
+    sentences = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 12)
+        sentences.extend(parser.feed(text[i:i + step]))
+        i += step
+    sentences.extend(parser.finish())
+    return " ".join(sentences), parser.call_status, parser.language
+
+
+def check_corpus(corpus: list) -> int:
+    failures = 0
+    for row in corpus:
+        expected = (row["speech"], row["call_status"], row["language"])
+        got = parse_contract(row["output"])
+        if got != expected:
+            failures += 1
+            print(f"❌ corpus: {row['output'][:60]!r}\n   expected {expected}\n   got      {got}")
+    return failures
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    choice = rng.randrange(6)
+    if choice == 0:
+        return text + rng.choice(["", " ", "\n", "\n\n", "  \n"])
+    if choice == 1:
+        return rng.choice(["", " ", "\n"]) + text
+    if choice == 2 and "{" in text:
+        brace = text.rfind("{")
+        return text[:brace] + "```json\n" + text[brace:] + "\n```"
+    if choice == 3:
+        return text[:rng.randint(0, len(text))]
+    if choice == 4:
+        return text.replace(", ", ",\n  ")
+    return text.replace('"ONGOING"', '"ongoing"')
+
+
+def fuzz(corpus: list, rounds: int, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(rounds):
+        text = mutate(rng.choice(corpus)["output"], rng)
+        try:
+            speech, call_status, language = parse_contract(text)
+            streamed = stream_parse(text, rng)
+        except Exception as e:
+            failures += 1
+            print(f"❌ fuzz raised {e!r} on {text!r}")
+            continue
+
+        if language is not None and '"call_status"' in speech:
+            failures += 1
+            print(f"❌ fuzz leaked trailer into speech: {text!r}")
+        if (words(streamed[0]), streamed[1], streamed[2]) != (words(speech), call_status, language):
+            failures += 1
+            print(f"❌ fuzz stream/batch mismatch on {text!r}\n   batch  {speech!r}\n   stream {streamed[0]!r}")
+    return failures
+
+
+def benchmark(corpus: list, iterations: int):
+    # Long replies: the regexes rescan the speech, the tail parser does not
+    padding = "The policy covers engine damage and roadside assistance. " * 30
+    sets = (
+        ("corpus", [row["output"] for row in corpus]),
+        ("long", [padding + row["output"] for row in corpus]),
+    )
+    for label, outputs in sets:
+        for name, parse in (("legacy", legacy_parse), ("contract", parse_contract)):
+            start = time.perf_counter()
+            for i in range(iterations):
+                parse(outputs[i % len(outputs)])
+            elapsed = time.perf_counter() - start
+            print(f"{label:<7} {name:<10} {elapsed / iterations * 1e6:8.2f} µs/reply")
+
+    legacy_wrong = sum(
+        1 for row in corpus
+        if legacy_parse(row["output"]) != (row["speech"], row["call_status"], row["language"])
+    )
+    print(f"legacy parser disagrees with the corpus on {legacy_wrong}/{len(corpus)} replies")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--fuzz", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    failures = check_corpus(corpus)
+    failures += fuzz(corpus, args.fuzz, args.seed)
+    print(f"{len(corpus)} corpus replies, {args.fuzz} fuzz rounds, {failures} failures")
+
+    benchmark(corpus, args.iterations)
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Stand-in OpenAI-compatible chat-completions server for load tests.
+
+Usage (from the repository root):
+
+    python -m benchmarks.fake_llm --port 8900 --ttft-ms 350 --tokens-per-s 60
+
+Point an agent at it with LLM_PROVIDER=openai and
+LLM_ENDPOINT=http://127.0.0.1:8900/v1 (any LLM_API_KEY). Azure-style
+/openai/deployments/<name>/chat/completions paths are accepted too.
+
+Replies follow the agents' output contract: a short spoken answer,
+then the {"call_status", "language"} JSON trailer. A turn whose last
+user message says goodbye ends the call. Post-call summary prompts
+get a JSON summary. Time to first token, token rate and jitter are
+configurable. Nothing leaves the machine.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+GOODBYES = ("bye", "goodbye", "that's all", "not interested", "call later")
+
+REPLIES = (
+    "Sure, I can help you with that.",
+    "Thank you, I have noted that down.",
+    "Zero depreciation cover pays the full cost of replaced parts without any deduction.",
+    "Your current quote includes engine protect and roadside assistance.",
+    "Could you please confirm your vehicle registration number?",
+    "The premium depends on your IDV and any no claim bonus you carry forward.",
+)
+
+SUMMARY = {
+    "Disposition": "Contacted",
+    "SubDisposition": "Interested",
+    "Summary": "Caller asked about renewal and add-ons.",
+}
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLM:
+    def __init__(self, ttft_ms: float, tokens_per_s: float, jitter: float, seed: int = 0):
+        self.ttft = ttft_ms / 1000
+        self.token_interval = 1 / tokens_per_s if tokens_per_s > 0 else 0.0
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _scaled(self, seconds: float) -> float:
+        with self._lock:
+            factor = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, seconds * factor)
+
+    def reply(self, messages: list) -> str:
+        with self._lock:
+            self.requests += 1
+            choice = self._random.choice(REPLIES)
+
+        # Post-call summary prompts (both agents) open with this phrase
+        first = str(messages[0].get("content", "")) if messages else ""
+        if "that summarizes" in first[:200]:
+            return json.dumps(SUMMARY)
+
+        last_user = next(
+            (str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"),
+            ""
+        ).lower()
+        ended = any(phrase in last_user for phrase in GOODBYES)
+        speech = "Thank you for your time, have a great day." if ended else choice
+        trailer = {"call_status": "END" if ended else "ONGOING", "language": "English"}
+        return f"{speech}\n{json.dumps(trailer)}"
+
+    def tokens(self, text: str) -> list:
+        # One token per word (with its trailing space)
+        words = text.split(" ")
+        return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    llm = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        content = self.llm.reply(messages)
+        tokens = self.llm.tokens(content)
+        usage = {
+            "prompt_tokens": sum(approx_tokens(str(m.get("content", ""))) for m in messages),
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {
+            "id": f"chatcmpl-{self.llm.requests}",
+            "created": int(time.time()),
+            "model": body.get("model") or "fake-llm",
+        }
+
+        time.sleep(self.llm._scaled(self.llm.ttft))
+
+        if not body.get("stream"):
+            for _ in tokens[1:]:
+                time.sleep(self.llm._scaled(self.llm.token_interval))
+            payload = json.dumps({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(event: dict = None):
+            data = f"data: {json.dumps(event) if event is not None else '[DONE]'}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        chunk = {**base, "object": "chat.completion.chunk"}
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(self.llm._scaled(self.llm.token_interval))
+                delta = {"content": token}
+                if i == 0:
+                    delta["role"] = "assistant"
+                send({**chunk, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+
+            send({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if (body.get("stream_options") or {}).get("include_usage"):
+                send({**chunk, "choices": [], "usage": usage})
+            send(None)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Caller cancelled the stream (e.g. a hedged request lost)
+            self.close_connection = True
+
+
+def serve(port: int, ttft_ms: float, tokens_per_s: float, jitter: float, host: str = "127.0.0.1"):
+    Handler.llm = FakeLLM(ttft_ms, tokens_per_s, jitter)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"✅ Fake LLM on http://{host}:{port}/v1 (ttft={ttft_ms}ms, {tokens_per_s} tok/s, jitter={jitter})")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=350)
+    parser.add_argument("--tokens-per-s", type=float, default=60)
+    parser.add_argument("--jitter", type=float, default=0.2, help="± fraction applied to every delay")
+    args = parser.parse_args()
+
+    serve(args.port, args.ttft_ms, args.tokens_per_s, args.jitter, args.host)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Tail latency with and without hedged LLM requests.
+
+Usage (from the repository root):
+
+    python -m benchmarks.hedging --requests 500 --slow-rate 0.05
+
+Both endpoints are in-process stubs: most calls take --base-ms, a
+--slow-rate fraction take --slow-ms (a congested deployment), and
+--error-rate of them fail outright. No provider traffic is sent.
+"""
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from core.llm_router import HedgedLLM, Endpoint
+
+
+class StubEndpoint:
+    """Chat-model stand-in with injected heavy-tail latency."""
+
+    def __init__(self, name: str, base_ms: float, slow_ms: float, slow_rate: float,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.name = name
+        self.base_ms = base_ms
+        self.slow_ms = slow_ms
+        self.slow_rate = slow_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, **kwargs):
+        roll = self._random.random()
+        if roll < self.error_rate:
+            await asyncio.sleep(self.base_ms / 1000)
+            raise RuntimeError(f"{self.name}: injected 503")
+
+        ms = self.slow_ms if roll < self.error_rate + self.slow_rate else self.base_ms
+        await asyncio.sleep(ms * self._random.uniform(0.8, 1.2) / 1000)
+        return f"reply from {self.name}"
+
+
+def report(name: str, samples: list):
+    cuts = statistics.quantiles(samples, n=100)
+    print(
+        f"{name:<10} n={len(samples):<5} "
+        f"p50={cuts[49] * 1000:8.1f}ms  "
+        f"p95={cuts[94] * 1000:8.1f}ms  "
+        f"p99={cuts[98] * 1000:8.1f}ms"
+    )
+
+
+async def run(llm, requests: int, concurrency: int) -> tuple:
+    samples = []
+    failures = 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await llm.ainvoke([])
+            except Exception:
+                failures += 1
+                return
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples, failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-ms", type=float, default=300)
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--percentile", type=float, default=90)
+    args = parser.parse_args()
+
+    def endpoint(name, seed):
+        return StubEndpoint(
+            name, args.base_ms, args.slow_ms, args.slow_rate, args.error_rate, seed
+        )
+
+    # Baseline: primary only
+    samples, failures = await run(endpoint("primary", 1), args.requests, args.concurrency)
+    report("single", samples)
+    print(f"{'':<10} failures={failures}")
+
+    # Hedged: primary + secondary. Cooldown is disabled so a single
+    # injected error does not skew the comparison.
+    hedged = HedgedLLM(
+        [Endpoint("primary", endpoint("primary", 1)),
+         Endpoint("secondary", endpoint("secondary", 2))],
+        hedge_percentile=args.percentile,
+        default_hedge_delay=args.base_ms * 2 / 1000,
+        cooldown=0
+    )
+    samples, failures = await run(hedged, args.requests, args.concurrency)
+    report("hedged", samples)
+    print(f"{'':<10} failures={failures}")
+
+    for name, stats in hedged.stats().items():
+        print(f"{name:<10} {stats}")
+
+    hedges = sum(e.stats["hedged_to"] for e in hedged.endpoints)
+    extra = hedges / args.requests if args.requests else 0.0
+    print(f"Extra load from hedging: {extra:.1%} of requests")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,382 @@
+"""
+/chat load test for the insurance and lending agents.
+
+Usage (from the repository root):
+
+    python -m benchmarks.load_test insurance --callers 200 --concurrency 20
+    python -m benchmarks.load_test lending --stream --compare
+
+Starts benchmarks.fake_llm and the agent (benchmarks.serve, retriever
+stubbed) as subprocesses, then runs scripted multi-turn callers at a
+fixed concurrency: each caller greets, gives a name and registration
+number, asks a policy question and says goodbye. Reports p50/p95/p99
+turn latency (and time to first chunk with --stream), turns/s, errors
+and agent RSS growth per open session, plus the agent's own /metrics.
+
+Results are written to benchmarks/results/<agent>-<timestamp>.json
+with the git commit; --compare prints the change against the previous
+run for the same agent and mode. --url benchmarks an agent that is
+already running (memory per session is then only measured if it is a
+local process, via --pid).
+
+Callers are seeded (--seed), so a run with --cassette-mode record can
+be replayed against the agent with --cassette-mode replay and no LLM
+at all; --cassette-latency-scale 0 leaves only the agent's own time.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+import httpx
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SCRIPT = (
+    "Hello?",
+    "Yes, this is {name} speaking.",
+    "My vehicle registration number is {registration_number}.",
+    "What does zero depreciation cover include?",
+    "Okay, and is roadside assistance part of my quote?",
+    "Alright, thank you. Bye.",
+)
+
+NAMES = ("Asha", "Rahul", "Priya", "Vikram", "Meera", "Arjun")
+
+
+# =========================
+# Processes
+# =========================
+def spawn(module: str, *args, env: dict = None, log=None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", module, *map(str, args)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ, **(env or {})),
+        stdout=log or subprocess.DEVNULL,
+        stderr=subprocess.STDOUT
+    )
+
+
+def wait_until_up(url: str, process: subprocess.Popen = None, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before coming up")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def rss_kb(pid: int):
+    """Resident set size from /proc, or None where that is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =========================
+# Callers
+# =========================
+class Stats:
+    def __init__(self):
+        self.turns = []
+        self.first_chunks = []
+        self.errors = 0
+        self.error_samples = []
+
+    def error(self, message: str):
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(message)
+
+
+async def turn(client: httpx.AsyncClient, url: str, payload: dict, stream: bool, stats: Stats):
+    """One /chat turn; returns the reply's call_status, or None on error."""
+    start = time.perf_counter()
+    try:
+        if not stream:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+            call_status = response.json().get("call_status")
+        else:
+            call_status = None
+            first_chunk = None
+            async with client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if event.get("type") == "chunk" and first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    elif event.get("type") == "done":
+                        call_status = event.get("call_status")
+            if first_chunk is not None:
+                stats.first_chunks.append(first_chunk)
+    except (httpx.HTTPError, ValueError) as e:
+        stats.error(f"{type(e).__name__}: {e}")
+        return None
+
+    stats.turns.append(time.perf_counter() - start)
+    return call_status or "ONGOING"
+
+
+async def caller(client: httpx.AsyncClient, url: str, stream: bool, stats: Stats,
+                 rng: random.Random, turns: int = len(SCRIPT)):
+    session_id = str(uuid.uuid4())
+    base = {
+        "user_id": f"load-{session_id[:8]}",
+        "session_id": session_id,
+        "name": rng.choice(NAMES),
+        "registration_number": f"MH{rng.randint(1, 48):02d}AB{rng.randint(1000, 9999)}",
+        "stream": stream,
+    }
+    for line in SCRIPT[:turns]:
+        call_status = await turn(
+            client, url, {**base, "message": line.format(**base)}, stream, stats
+        )
+        if call_status in (None, "END"):
+            return
+
+
+async def run_callers(url: str, callers: int, concurrency: int, stream: bool,
+                      seed: int = 0, turns: int = len(SCRIPT)) -> tuple:
+    stats = Stats()
+    limit = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        async def one(index):
+            async with limit:
+                # Per-caller seed: the same caller says the same things every run
+                await caller(client, url, stream, stats, random.Random(f"{seed}:{index}"), turns)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(callers)))
+        elapsed = time.perf_counter() - start
+
+    return stats, elapsed
+
+
+# =========================
+# Report
+# =========================
+def percentiles(samples: list) -> dict:
+    if len(samples) < 2:
+        return {"p50": None, "p95": None, "p99": None, "mean": None}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "p50": round(cuts[49] * 1000, 1),
+        "p95": round(cuts[94] * 1000, 1),
+        "p99": round(cuts[98] * 1000, 1),
+        "mean": round(statistics.fmean(samples) * 1000, 1),
+    }
+
+
+def previous_result(agent: str, mode: str):
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    for name in sorted(os.listdir(RESULTS_DIR), reverse=True):
+        path = os.path.join(RESULTS_DIR, name)
+        if not name.startswith(f"{agent}-") or not name.endswith(".json"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        if result.get("mode") == mode:
+            return result
+    return None
+
+
+def print_result(result: dict, previous: dict = None):
+    def delta(key, sub=None):
+        if previous is None:
+            return ""
+        now = result[key][sub] if sub else result[key]
+        then = (previous.get(key) or {}).get(sub) if sub else previous.get(key)
+        if now is None or not then:
+            return ""
+        return f" ({(now - then) / then:+.0%})"
+
+    print(f"\n{result['agent']} ({result['mode']}) @ {result['commit']}")
+    print(f"  turns         {result['turns']}  errors={result['errors']}")
+    print(f"  throughput    {result['turns_per_s']} turns/s{delta('turns_per_s')}")
+    for key, label in (("latency_ms", "turn latency"), ("first_chunk_ms", "first chunk")):
+        if result.get(key) and result[key]["p50"] is not None:
+            print(
+                f"  {label:<13} "
+                + "  ".join(f"{q}={result[key][q]}ms{delta(key, q)}" for q in ("p50", "p95", "p99"))
+            )
+    if result.get("memory_per_session_kb") is not None:
+        print(f"  memory        {result['memory_per_session_kb']} KiB/session{delta('memory_per_session_kb')}")
+    if previous is not None:
+        print(f"  compared with {previous['commit']} ({previous['timestamp']})")
+    for sample in result.get("error_samples", []):
+        print(f"  ❌ {sample}")
+
+
+# =========================
+# Main
+# =========================
+async def benchmark(args, base_url: str, pid: int) -> dict:
+    url = f"{base_url}/chat"
+
+    # Warm-up: first LLM connections, graph compile paths, quotation
+    await run_callers(url, min(args.concurrency, 5), args.concurrency, args.stream, args.seed)
+
+    # Memory: RSS growth while --memory-sessions callers sit after one turn
+    memory_per_session = None
+    before = rss_kb(pid) if pid else None
+    if before is not None and args.memory_sessions:
+        await run_callers(url, args.memory_sessions, args.concurrency, args.stream, args.seed, turns=3)
+        after = rss_kb(pid)
+        memory_per_session = round((after - before) / args.memory_sessions, 1)
+
+    stats, elapsed = await run_callers(url, args.callers, args.concurrency, args.stream, args.seed)
+
+    try:
+        agent_metrics = httpx.get(f"{base_url}/metrics", params={"format": "json"}, timeout=5.0).json()
+    except (httpx.HTTPError, ValueError):
+        agent_metrics = None
+
+    return {
+        "agent": args.agent,
+        "mode": "stream" if args.stream else "json",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "config": {
+            "callers": args.callers,
+            "concurrency": args.concurrency,
+            "ttft_ms": args.ttft_ms,
+            "tokens_per_s": args.tokens_per_s,
+            "jitter": args.jitter,
+            "memory_sessions": args.memory_sessions,
+            "seed": args.seed,
+            "cassette_mode": args.cassette_mode,
+        },
+        "turns": len(stats.turns),
+        "errors": stats.errors,
+        "error_samples": stats.error_samples,
+        "elapsed_s": round(elapsed, 2),
+        "turns_per_s": round(len(stats.turns) / elapsed, 2) if elapsed else None,
+        "latency_ms": percentiles(stats.turns),
+        "first_chunk_ms": percentiles(stats.first_chunks) if args.stream else None,
+        "memory_per_session_kb": memory_per_session,
+        "agent_metrics": agent_metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("agent", choices=["insurance", "lending"])
+    parser.add_argument("--callers", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--stream", action="store_true", help="Use SSE turns and report time to first chunk")
+    parser.add_argument("--memory-sessions", type=int, default=200)
+    parser.add_argument("--ttft-ms", type=float, default=350)
+    parser.add_argument("--tokens-per-s", type=float, default=60)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--llm-port", type=int, default=8900)
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--url", help="Benchmark an already running agent instead")
+    parser.add_argument("--pid", type=int, help="Local pid of the --url agent, for memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cassette", default=os.path.join(RESULTS_DIR, "cassette.jsonl"))
+    parser.add_argument("--cassette-mode", choices=["off", "record", "replay"], default="off")
+    parser.add_argument("--cassette-latency-scale", type=float, default=1.0)
+    parser.add_argument("--log", help="Append the agent's output to this file")
+    parser.add_argument("--compare", action="store_true", help="Show the change since the previous saved run")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    processes = []
+    log = open(args.log, "a") if args.log else None
+    try:
+        if args.url:
+            base_url, pid = args.url.rstrip("/"), args.pid
+        else:
+            if args.cassette_mode != "replay":
+                llm = spawn(
+                    "benchmarks.fake_llm",
+                    "--port", args.llm_port,
+                    "--ttft-ms", args.ttft_ms,
+                    "--tokens-per-s", args.tokens_per_s,
+                    "--jitter", args.jitter,
+                    log=log
+                )
+                processes.append(llm)
+                wait_until_up(f"http://127.0.0.1:{args.llm_port}/", llm)
+
+            # The agent talks to the fake LLM only; nothing leaves the machine
+            env = {
+                "LLM_PROVIDER": "openai",
+                "LLM_MODEL_NAME": "fake-llm",
+                "LLM_ENDPOINT": f"http://127.0.0.1:{args.llm_port}/v1",
+                "LLM_API_KEY": "fake",
+                "LLM_SECONDARY_ENDPOINT": "",
+                "STARTUP_WARMUP": "false",
+                "TRACING_EXPORTER": "none",
+                "SHARED_STATE_DIR": tempfile.mkdtemp(prefix="load-test-"),
+                "LLM_CASSETTE_MODE": args.cassette_mode,
+                "LLM_CASSETTE_PATH": os.path.abspath(args.cassette),
+                "LLM_CASSETTE_LATENCY_SCALE": str(args.cassette_latency_scale),
+            }
+            agent = spawn("benchmarks.serve", args.agent, "--port", args.port, env=env, log=log)
+            processes.append(agent)
+            base_url, pid = f"http://127.0.0.1:{args.port}", agent.pid
+            wait_until_up(f"{base_url}/ready", agent)
+
+        result = asyncio.run(benchmark(args, base_url, pid))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if log is not None:
+            log.close()
+
+    previous = previous_result(result["agent"], result["mode"]) if args.compare else None
+    print_result(result, previous)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(
+            RESULTS_DIR, f"{result['agent']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"  saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Runs one agent for a load test, with the retriever stubbed out.
+
+Usage (from the repository root; normally started by benchmarks.load_test):
+
+    LLM_PROVIDER=openai LLM_MODEL_NAME=fake-llm LLM_ENDPOINT=http://127.0.0.1:8900/v1 \\
+        LLM_API_KEY=fake python -m benchmarks.serve insurance --port 8801
+
+The insurance agent's embeddings and vector store are replaced by the
+in-memory stubs from benchmarks.stubs before the first request; the
+LLM is whatever LLM_ENDPOINT points at (benchmarks.fake_llm).
+"""
+import argparse
+
+from benchmarks.stubs import StubEmbeddings, StubVectorStore
+
+
+def serve_insurance(host: str, port: int, embed_ms: float, search_ms: float):
+    import uvicorn
+    from domains.insurance_agent import rag
+    from domains.insurance_agent.app import app
+
+    rag.embeddings = StubEmbeddings(embed_ms)
+    rag.vectorstore = StubVectorStore(search_ms)
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
+
+
+def serve_lending(host: str, port: int):
+    from werkzeug.serving import make_server
+    from domains.lending_agent.app import app
+
+    # Threaded, like the agent behind a WSGI server; no reloader/debugger
+    make_server(host, port, app, threaded=True).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("agent", choices=["insurance", "lending"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--embed-ms", type=float, default=5.0)
+    parser.add_argument("--search-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"✅ {args.agent} agent on http://{args.host}:{args.port}")
+    if args.agent == "insurance":
+        serve_insurance(args.host, args.port, args.embed_ms, args.search_ms)
+    else:
+        serve_lending(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
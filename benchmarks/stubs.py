@@ -0,0 +1,79 @@
+"""
+In-memory stand-ins for the insurance agent's embedding model and
+vector store, used by benchmarks.serve so load tests need neither
+sentence-transformers nor Qdrant.
+
+Embeddings are hashed bag-of-words vectors; search is a dot product
+over a small built-in corpus. Both add a configurable delay so the
+retrieval leg of a turn still costs something.
+"""
+import time
+import asyncio
+import hashlib
+
+from langchain.schema import Document
+
+
+DIMENSIONS = 64
+
+CORPUS = (
+    "Zero depreciation cover pays the full cost of replaced parts without deducting depreciation.",
+    "Engine protect covers damage to the engine from water ingress and oil leakage.",
+    "Roadside assistance includes towing, flat tyre help and fuel delivery up to 5 litres.",
+    "No claim bonus rewards claim-free years with a discount of 20 to 50 percent on own damage premium.",
+    "The insured declared value (IDV) is the current market value of the vehicle.",
+    "Return to invoice cover pays the gap between the IDV and the invoice price on total loss.",
+    "Consumables cover pays for nuts, bolts, engine oil and coolant used during repairs.",
+    "Third party liability cover is mandatory and covers injury or damage to others.",
+    "A policy can be renewed up to 90 days after expiry without losing the no claim bonus.",
+    "Personal accident cover for the owner-driver is Rs 15 lakh under the current rules.",
+    "Key replacement cover pays for lost or stolen car keys and lock replacement.",
+    "Claims are settled cashless at network garages and by reimbursement elsewhere.",
+)
+
+
+def embed(text: str) -> list:
+    vector = [0.0] * DIMENSIONS
+    for word in text.lower().split():
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=2).digest()
+        vector[int.from_bytes(digest, "little") % DIMENSIONS] += 1.0
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+class StubEmbeddings:
+    def __init__(self, latency_ms: float = 5.0):
+        self.latency = latency_ms / 1000
+
+    def embed_query(self, text: str) -> list:
+        time.sleep(self.latency)
+        return embed(text)
+
+    async def aembed_query(self, text: str) -> list:
+        await asyncio.sleep(self.latency)
+        return embed(text)
+
+
+class StubVectorStore:
+    def __init__(self, latency_ms: float = 10.0, corpus: tuple = CORPUS):
+        self.latency = latency_ms / 1000
+        self.documents = [
+            (embed(text), Document(page_content=text, metadata={"source": f"stub-{i}"}))
+            for i, text in enumerate(corpus)
+        ]
+
+    def _search(self, vector: list, k: int) -> list:
+        scored = sorted(
+            self.documents,
+            key=lambda item: sum(a * b for a, b in zip(item[0], vector)),
+            reverse=True
+        )
+        return [doc for _, doc in scored[:k]]
+
+    def similarity_search_by_vector(self, vector: list, k: int = 4) -> list:
+        time.sleep(self.latency)
+        return self._search(vector, k)
+
+    async def asimilarity_search_by_vector(self, vector: list, k: int = 4) -> list:
+        await asyncio.sleep(self.latency)
+        return self._search(vector, k)
@@ -0,0 +1,105 @@
+"""
+Retrieval latency: in-process NumPy index vs remote Qdrant.
+
+Usage (from the repository root):
+
+    # Local index only, synthetic data (no external services)
+    python -m benchmarks.vector_backends --synthetic 5000
+
+    # Local snapshot vs the live Qdrant collection it was exported from
+    QDRANT_URL=... python -m benchmarks.vector_backends \\
+        --snapshot data/vector_snapshot --qdrant
+
+Query vectors are perturbed copies of indexed rows, so both backends
+do the same top-k search and no embedding model time is included.
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+from langchain.schema import Document
+
+from domains.insurance_agent.vector_index import LocalVectorIndex
+
+
+def percentile_ms(samples: list, pct: float) -> float:
+    return float(np.percentile(samples, pct)) * 1000
+
+
+def report(name: str, samples: list):
+    print(
+        f"{name:<14} n={len(samples):<5} "
+        f"p50={percentile_ms(samples, 50):8.3f}ms  "
+        f"p95={percentile_ms(samples, 95):8.3f}ms  "
+        f"p99={percentile_ms(samples, 99):8.3f}ms"
+    )
+
+
+def time_queries(search, queries: list, k: int) -> list:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, k=k)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def synthetic_index(rows: int, dim: int) -> LocalVectorIndex:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [
+        Document(page_content=f"chunk {i}", metadata={"source": "synthetic", "page": i})
+        for i in range(rows)
+    ]
+    return LocalVectorIndex(vectors, documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--snapshot", help="Local vector snapshot directory")
+    parser.add_argument("--synthetic", type=int, default=0, help="Rows of synthetic data")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--mmap", action="store_true")
+    parser.add_argument("--qdrant", action="store_true", help="Also time the Qdrant path")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        index = LocalVectorIndex.load(args.snapshot, mmap=args.mmap)
+    else:
+        index = synthetic_index(args.synthetic or 5000, args.dim)
+
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, len(index.documents), args.queries)
+    noise = rng.standard_normal((args.queries, index.vectors.shape[1])) * 0.05
+    queries = [np.asarray(index.vectors[r]) + n for r, n in zip(rows, noise)]
+
+    print(f"Index: {len(index.documents)} chunks x {index.vectors.shape[1]} dims")
+
+    # Warm-up (page in mmap'd rows, BLAS thread pools)
+    time_queries(index.similarity_search_by_vector, queries[:20], args.k)
+    report("local", time_queries(index.similarity_search_by_vector, queries, args.k))
+
+    if args.qdrant:
+        from langchain.vectorstores import Qdrant
+        from qdrant_client import QdrantClient
+
+        qdrant = Qdrant(
+            client=QdrantClient(
+                url=os.getenv("QDRANT_URL"),
+                api_key=os.getenv("QDRANT_API_KEY")
+            ),
+            collection_name=os.getenv("VECTOR_COLLECTION_NAME", "insurance_docs"),
+            embeddings=None
+        )
+        as_lists = [q.tolist() for q in queries]
+
+        time_queries(qdrant.similarity_search_by_vector, as_lists[:20], args.k)
+        report("qdrant", time_queries(qdrant.similarity_search_by_vector, as_lists, args.k))
+
+
+if __name__ == "__main__":
+    main()
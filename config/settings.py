@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # =========================
 # LLM Provider Configuration
@@ -7,16 +8,91 @@ import os
 # Any LLM backend (cloud-hosted or self-hosted) can be used
 # as long as it exposes a chat-style inference interface.
 
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
-# Examples: openai, sarvam, mistral, llama, custom
+# The AZURE_* variables used by earlier deployments still work as
+# fallbacks; setting them selects the Azure provider by default.
+LLM_PROVIDER = os.getenv(
+    "LLM_PROVIDER",
+    "azure" if os.getenv("AZURE_OPENAI_ENDPOINT") else "openai"
+)
+# Examples: azure, openai, sarvam, mistral, llama, custom
+# (anything other than azure is called as an OpenAI-compatible endpoint)
 
-LLM_API_KEY = os.getenv("LLM_API_KEY")
-LLM_ENDPOINT = os.getenv("LLM_ENDPOINT")
-LLM_API_VERSION = os.getenv("LLM_API_VERSION")
-LLM_DEPLOYMENT_NAME = os.getenv("LLM_DEPLOYMENT_NAME")
+LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("AZURE_OPENAI_API_KEY")
+LLM_ENDPOINT = os.getenv("LLM_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
+LLM_API_VERSION = os.getenv("LLM_API_VERSION") or os.getenv("AZURE_OPENAI_API_VERSION")
+LLM_DEPLOYMENT_NAME = os.getenv("LLM_DEPLOYMENT_NAME") or os.getenv("AZURE_DEPLOYMENT_NAME")
 LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME")
 
 MAX_RESPONSE_TOKENS = int(os.getenv("MAX_RESPONSE_TOKENS", "90"))
+MAX_SUMMARY_TOKENS = int(os.getenv("MAX_SUMMARY_TOKENS", "512"))
+MAX_QUOTE_SUMMARY_TOKENS = int(os.getenv("MAX_QUOTE_SUMMARY_TOKENS", "400"))
+
+# One keep-alive connection pool is shared by every agent and role.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "120"))
+
+# Secondary endpoint/deployment for hedged requests and failover.
+# When set, live calls still unanswered after the primary's recent
+# p90 latency are also sent here; first response wins.
+LLM_SECONDARY_ENDPOINT = os.getenv("LLM_SECONDARY_ENDPOINT")
+LLM_SECONDARY_DEPLOYMENT_NAME = (
+    os.getenv("LLM_SECONDARY_DEPLOYMENT_NAME") or LLM_DEPLOYMENT_NAME
+)
+LLM_SECONDARY_API_KEY = os.getenv("LLM_SECONDARY_API_KEY") or LLM_API_KEY
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "2.0"))
+LLM_FAILOVER_COOLDOWN_SECONDS = float(os.getenv("LLM_FAILOVER_COOLDOWN_SECONDS", "30"))
+
+# Record/replay cassette (core/llm_cassette.py): off | record | replay.
+# record forwards every chat-model call and appends its reply to
+# LLM_CASSETTE_PATH; replay serves replies from it (recorded latency x
+# LLM_CASSETTE_LATENCY_SCALE, 0 = instant) and fails on a miss.
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl")
+LLM_CASSETTE_LATENCY_SCALE = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "1.0"))
+# Recording leaves live prompts alone (keys ignore the CALL CONTEXT
+# time of day). Replay pins the time of day, which also picks the
+# opening greeting, to this bucket or, when unset, to the bucket
+# most calls in the cassette were recorded in.
+LLM_CASSETTE_TIME_OF_DAY = os.getenv("LLM_CASSETTE_TIME_OF_DAY", "")
+
+# Pre-warm pooled connections (TLS handshake + 1-token request) at startup
+LLM_PREWARM = os.getenv("LLM_PREWARM", "true").lower() == "true"
+LLM_PREWARM_CONNECTIONS = int(os.getenv("LLM_PREWARM_CONNECTIONS", "2"))
+
+# Output contract (core/contract.py): false = free text ending in a
+# {"call_status", "language"} JSON trailer; true = provider-enforced
+# JSON-schema reply. Structured replies are spoken only once complete,
+# so streamed turns lose sentence-by-sentence TTS in this mode.
+CONTRACT_STRUCTURED_OUTPUT = (
+    os.getenv("CONTRACT_STRUCTURED_OUTPUT", "false").lower() == "true"
+)
+
+# =========================
+# Startup
+# =========================
+# Embeddings, vector store and LLM clients are built lazily on first
+# use. STARTUP_WARMUP builds them in the background right after boot;
+# READY_REQUIRES_WARM makes /ready return 503 until they are all warm.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+READY_REQUIRES_WARM = os.getenv("READY_REQUIRES_WARM", "false").lower() == "true"
+
+# =========================
+# Tracing (core/tracing.py)
+# =========================
+# TRACING_EXPORTER: none | jsonl | console | package.module:factory.
+# Sampled turns record spans for request parsing, graph nodes, LLM and
+# retriever calls and serialization. A TRACE_PROFILE_SAMPLE_RATE share
+# of turns also runs under cProfile; profiles of turns slower than
+# TRACE_PROFILE_MIN_MS are saved to TRACE_PROFILE_DIR/<trace_id>.prof.
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "traces/spans.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_PROFILE_SAMPLE_RATE = float(os.getenv("TRACE_PROFILE_SAMPLE_RATE", "0"))
+TRACE_PROFILE_MIN_MS = float(os.getenv("TRACE_PROFILE_MIN_MS", "2000"))
+TRACE_PROFILE_DIR = os.getenv("TRACE_PROFILE_DIR", "traces/profiles")
 
 # =========================
 # Runtime Defaults
@@ -33,6 +109,11 @@ VECTOR_DB_URL = os.getenv("VECTOR_DB_URL")
 VECTOR_DB_API_KEY = os.getenv("VECTOR_DB_API_KEY")
 VECTOR_COLLECTION_NAME = os.getenv("VECTOR_COLLECTION_NAME", "agent_docs")
 
+# VECTOR_DB_TYPE=local: in-process NumPy index loaded from a snapshot
+# directory (see domains/insurance_agent/vector_index.py).
+LOCAL_VECTOR_SNAPSHOT_PATH = os.getenv("LOCAL_VECTOR_SNAPSHOT_PATH", "data/vector_snapshot")
+LOCAL_VECTOR_MMAP = os.getenv("LOCAL_VECTOR_MMAP", "false").lower() == "true"
+
 ENABLE_RAG = os.getenv("ENABLE_RAG", "true").lower() == "true"
 
 # =========================
@@ -42,3 +123,103 @@ ENABLE_RAG = os.getenv("ENABLE_RAG", "true").lower() == "true"
 ENABLE_QUOTATION_PRELOAD = (
     os.getenv("ENABLE_QUOTATION_PRELOAD", "true").lower() == "true"
 )
+
+# A call that opens with a plain greeting gets its first reply from a
+# template instead of an LLM call (core/opening_turn.py).
+ENABLE_OPENING_TURN = os.getenv("ENABLE_OPENING_TURN", "true").lower() == "true"
+
+# =========================
+# Host-wide Shared State
+# =========================
+# Startup context (the preloaded quotation) is computed once per host
+# by a leader worker and shared with all uvicorn/gunicorn workers
+# through a versioned snapshot file (see core/shared_snapshot.py).
+
+SHARED_STATE_DIR = os.getenv(
+    "SHARED_STATE_DIR",
+    os.path.join(tempfile.gettempdir(), "agentic-ai-shared-state")
+)
+QUOTATION_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("QUOTATION_SNAPSHOT_MAX_AGE_SECONDS", "3600"))
+QUOTATION_SNAPSHOT_POLL_SECONDS = float(os.getenv("QUOTATION_SNAPSHOT_POLL_SECONDS", "5"))
+
+# =========================
+# Session Store
+# =========================
+# Conversations are held server-side, keyed by session_id,
+# so clients only send the new utterance on each turn.
+
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "5000"))
+SESSION_IDLE_TTL_SECONDS = int(os.getenv("SESSION_IDLE_TTL_SECONDS", "900"))
+
+# =========================
+# Post-call Summarization
+# =========================
+# Summaries run on a bounded background pool, off the live turn.
+# Results are polled via GET /summary/{session_id} and optionally
+# POSTed to SUMMARY_WEBHOOK_URL.
+
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "2"))
+SUMMARY_QUEUE_SIZE = int(os.getenv("SUMMARY_QUEUE_SIZE", "100"))
+SUMMARY_RESULT_RETENTION = int(os.getenv("SUMMARY_RESULT_RETENTION", "5000"))
+SUMMARY_WEBHOOK_URL = os.getenv("SUMMARY_WEBHOOK_URL")
+
+# =========================
+# Rolling Context Window
+# =========================
+# The model sees the system prompt, a running summary of older
+# turns and the last CONTEXT_KEEP_TURNS turns verbatim.
+# Set CONTEXT_KEEP_TURNS=0 to always send the full conversation.
+
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "8"))
+CONTEXT_FOLD_BATCH_TURNS = int(os.getenv("CONTEXT_FOLD_BATCH_TURNS", "4"))
+
+# =========================
+# Retrieval Cache
+# =========================
+
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "2048"))
+RETRIEVAL_CACHE_TTL_SECONDS = int(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "3600"))
+
+# =========================
+# Semantic Answer Cache (insurance)
+# =========================
+# Knowledge-question turns whose query embedding is at least
+# ANSWER_CACHE_THRESHOLD (cosine) close to an earlier one at the same
+# conversation stage reuse its answer instead of a new generation.
+# Answers carrying quotation figures are never cached or served.
+
+ENABLE_ANSWER_CACHE = os.getenv("ENABLE_ANSWER_CACHE", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.93"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+
+# =========================
+# Speculative Prefetch (ASR partials)
+# =========================
+# POST /partial starts retrieval on partial transcripts. The final
+# turn reuses it if the transcript is at least this similar.
+# Speculative generation (stable partials, exact match only) is opt-in.
+
+SPECULATIVE_MATCH_THRESHOLD = float(os.getenv("SPECULATIVE_MATCH_THRESHOLD", "0.9"))
+SPECULATIVE_GENERATION = (
+    os.getenv("SPECULATIVE_GENERATION", "false").lower() == "true"
+)
+
+# =========================
+# Quotation Cache (per vehicle)
+# =========================
+# Fresh entries are served as-is; stale ones are served while a
+# background refresh runs. A miss waits at most
+# QUOTATION_MISS_TIMEOUT_SECONDS before falling back to the
+# shared preloaded quotation.
+
+QUOTATION_CACHE_SIZE = int(os.getenv("QUOTATION_CACHE_SIZE", "1000"))
+QUOTATION_FRESH_TTL_SECONDS = int(os.getenv("QUOTATION_FRESH_TTL_SECONDS", "900"))
+QUOTATION_STALE_TTL_SECONDS = int(os.getenv("QUOTATION_STALE_TTL_SECONDS", "86400"))
+QUOTATION_MISS_TIMEOUT_SECONDS = float(os.getenv("QUOTATION_MISS_TIMEOUT_SECONDS", "2.0"))
+
+# Multi-insurer fan-out: "Name:latency[:jitter],..." builds local stub
+# adapters queried concurrently; insurers that miss the deadline are
+# left out. Empty = single dummy quotation API.
+QUOTATION_INSURERS = os.getenv("QUOTATION_INSURERS", "")
+QUOTATION_DEADLINE_SECONDS = float(os.getenv("QUOTATION_DEADLINE_SECONDS", "1.5"))
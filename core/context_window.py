@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+
+
+FOLD_PROMPT = """
+You maintain a running summary of an ongoing phone call between an agent and a customer.
+Update the summary below with the new turns.
+
+Rules:
+- Keep every fact the customer shared (names, vehicle / loan details, dates, numbers, preferences)
+- Keep decisions made and questions already answered, so they are not asked again
+- Drop greetings, filler and the agent's explanations
+- At most 120 words, plain text, no markdown
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:
+"""
+
+
+class _Memory:
+    def __init__(self):
+        self.summary = ""
+        self.folded = 0         # body messages already covered by summary
+        self.folding = False
+
+
+# =========================
+# Context Window
+# =========================
+class ContextWindow:
+    """
+    Bounds the prompt sent to the model on each turn.
+
+    The leading system messages and the last `keep_turns` user
+    turns are sent verbatim; older turns are folded into a running
+    summary by a background worker, off the critical path. Until a
+    fold completes the unfolded turns are still sent verbatim, so
+    nothing is ever dropped. The stored conversation is untouched.
+    """
+
+    def __init__(
+        self,
+        llm,
+        keep_turns: int = 8,
+        fold_batch_turns: int = 4,
+        max_sessions: int = 5000,
+        workers: int = 2,
+    ):
+        self.llm = llm
+        self.keep_turns = keep_turns
+        self.fold_batch_turns = fold_batch_turns
+        self.max_sessions = max_sessions
+        self._memories = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="context-fold"
+        )
+
+    def build(self, session_id: str, conversation: list) -> list:
+        """Returns the messages to send for this turn."""
+        if self.keep_turns <= 0:
+            return conversation
+
+        prefix_len = 0
+        while prefix_len < len(conversation) and isinstance(conversation[prefix_len], SystemMessage):
+            prefix_len += 1
+
+        prefix = conversation[:prefix_len]
+        body = conversation[prefix_len:]
+        cut = self._cut_index(body)
+
+        with self._lock:
+            memory = self._memory(session_id)
+            summary, folded = memory.summary, memory.folded
+
+            if (
+                not memory.folding
+                and self._turns(body[folded:cut]) >= self.fold_batch_turns
+            ):
+                memory.folding = True
+                self._pool.submit(
+                    self._fold, session_id, memory, summary, folded, cut, body[folded:cut]
+                )
+
+        messages = list(prefix)
+        if summary:
+            messages.append(SystemMessage(content=f"### EARLIER IN THIS CALL\n\n{summary}"))
+        messages.extend(body[folded:])
+        return messages
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._memories.pop(session_id, None)
+
+    def _cut_index(self, body: list) -> int:
+        """Index of the first message that must stay verbatim."""
+        seen = 0
+        for i in range(len(body) - 1, -1, -1):
+            if isinstance(body[i], HumanMessage):
+                seen += 1
+                if seen == self.keep_turns:
+                    return i
+        return 0
+
+    @staticmethod
+    def _turns(messages: list) -> int:
+        return sum(1 for m in messages if isinstance(m, HumanMessage))
+
+    def _memory(self, session_id: str) -> _Memory:
+        memory = self._memories.get(session_id)
+        if memory is None:
+            memory = self._memories[session_id] = _Memory()
+            while len(self._memories) > self.max_sessions:
+                self._memories.popitem(last=False)
+        else:
+            self._memories.move_to_end(session_id)
+        return memory
+
+    def _fold(self, session_id, memory, summary, start, end, messages):
+        turns = "\n".join(
+            f"{'Agent' if isinstance(m, AIMessage) else 'User'}: {m.content}"
+            for m in messages
+        )
+
+        try:
+            response = self.llm.invoke([
+                HumanMessage(content=FOLD_PROMPT.format(
+                    summary=summary or "(none yet)",
+                    turns=turns
+                ))
+            ])
+            new_summary = response.content.strip()
+        except Exception as e:
+            print(f"❌ Context fold failed for {session_id}:", str(e))
+            new_summary = None
+
+        with self._lock:
+            memory.folding = False
+            if new_summary and memory.folded == start:
+                memory.summary = new_summary
+                memory.folded = end
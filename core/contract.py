@@ -0,0 +1,165 @@
+import json
+
+from config.settings import CONTRACT_STRUCTURED_OUTPUT
+
+
+# =========================
+# Output contract
+# =========================
+# Every agent reply ends with a JSON trailer on its own line:
+#
+#     Sure, I can help with that.
+#     {"call_status": "ONGOING", "language": "English"}
+#
+# parse_contract() splits a reply into (speech, call_status, language)
+# anchored at the tail: candidate opening braces are found right to
+# left with rfind() and validated by the C JSON decoder, so the speech
+# is never re-scanned by a greedy regex and multi-line or nested
+# trailers parse the same as single-line ones.
+
+CALL_STATUSES = ("ONGOING", "END")
+DEFAULT_CALL_STATUS = "ONGOING"
+
+# Opening braces tried, right to left, before giving up on the tail
+MAX_TRAILER_DEPTH = 8
+
+_decoder = json.JSONDecoder()
+
+
+def _skip_fence_back(text: str, end: int) -> int:
+    """Index just past the last non-space char, ignoring a closing ``` fence."""
+    while end > 0 and text[end - 1].isspace():
+        end -= 1
+    if text.endswith("```", 0, end):
+        end -= 3
+        while end > 0 and text[end - 1].isspace():
+            end -= 1
+    return end
+
+
+def strip_fence_open(speech: str) -> str:
+    """Drops a dangling ```json opener left in front of the trailer."""
+    stripped = speech.rstrip()
+    for opener in ("```json", "```JSON", "```"):
+        if stripped.endswith(opener):
+            return stripped[:-len(opener)]
+    return speech
+
+
+def _as_contract(payload):
+    if isinstance(payload, dict) and "call_status" in payload:
+        return payload
+    return None
+
+
+def split_contract(text: str):
+    """
+    Returns (speech, payload). `payload` is the trailer dict, or None
+    if `text` carries no contract, in which case speech is `text`.
+    """
+    if not text:
+        return "", None
+
+    # 1️⃣ Tail-anchored: the trailer is the last thing in the reply.
+    # Nested trailers: inner objects decode but stop short of `end`,
+    # so keep moving left to the enclosing brace.
+    end = _skip_fence_back(text, len(text))
+    if end and text[end - 1] == "}":
+        start = text.rfind("{", 0, end)
+        for _ in range(MAX_TRAILER_DEPTH):
+            if start == -1:
+                break
+            try:
+                payload, stop = _decoder.raw_decode(text, start)
+            except ValueError:
+                stop = -1
+            if stop == end:
+                payload = _as_contract(payload)
+                if payload is not None:
+                    speech = strip_fence_open(text[:start]).strip()
+                    if "speech" in payload:
+                        # Structured-output mode: the reply is the contract
+                        speech = (speech + " " + str(payload.pop("speech") or "")).strip()
+                    return speech, payload
+                break
+            start = text.rfind("{", 0, start)
+
+    # 2️⃣ Fallback: the model kept talking after the trailer
+    key = text.rfind('"call_status"')
+    if key != -1:
+        start = text.rfind("{", 0, key)
+        while start != -1:
+            try:
+                payload, stop = _decoder.raw_decode(text, start)
+            except ValueError:
+                start = text.rfind("{", 0, start)
+                continue
+            if _as_contract(payload) is not None:
+                speech = strip_fence_open(text[:start]).rstrip() + " " + text[stop:].lstrip(" `\n")
+                return speech.strip(), payload
+            break
+
+    return text.strip(), None
+
+
+def normalize_call_status(value) -> str:
+    status = str(value or "").strip().upper()
+    return status if status in CALL_STATUSES else DEFAULT_CALL_STATUS
+
+
+def parse_contract(text: str):
+    """
+    Splits a model reply into (speech, call_status, language).
+    Missing or malformed trailers yield ("<text>", "ONGOING", None).
+    """
+    speech, payload = split_contract(text)
+    if payload is None:
+        return speech, DEFAULT_CALL_STATUS, None
+    return speech, normalize_call_status(payload.get("call_status")), payload.get("language")
+
+
+def render_contract(speech: str, call_status: str = DEFAULT_CALL_STATUS, language: str = None) -> str:
+    """
+    A reply in the shape the model is asked to produce (speech plus
+    trailer, or the structured JSON), for replies made without it.
+    """
+    payload = {"call_status": call_status, "language": language}
+    if CONTRACT_STRUCTURED_OUTPUT:
+        return json.dumps({"speech": speech, **payload}, ensure_ascii=False)
+    return f"{speech}\n{json.dumps(payload, ensure_ascii=False)}"
+
+
+# =========================
+# Structured-output mode
+# =========================
+# With CONTRACT_STRUCTURED_OUTPUT=true the provider is asked for a
+# JSON-schema constrained reply ({"speech", "call_status", "language"})
+# instead of free text plus a trailer. parse_contract() handles both.
+
+RESPONSE_SCHEMA = {
+    "name": "agent_turn",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "speech": {
+                "type": "string",
+                "description": "What the agent says to the caller"
+            },
+            "call_status": {"type": "string", "enum": list(CALL_STATUSES)},
+            "language": {
+                "type": "string",
+                "description": "Language of the agent's response"
+            },
+        },
+        "required": ["speech", "call_status", "language"],
+        "additionalProperties": False,
+    },
+}
+
+
+def bind_contract(llm):
+    """`llm` with the structured-output response format bound, if enabled."""
+    if not CONTRACT_STRUCTURED_OUTPUT:
+        return llm
+    return llm.bind(response_format={"type": "json_schema", "json_schema": RESPONSE_SCHEMA})
@@ -0,0 +1,111 @@
+import time
+import threading
+
+
+# =========================
+# Lazy Components
+# =========================
+# Heavy dependencies (embedding model, vector store, LLM clients)
+# are built on first use instead of at import, so a worker boots
+# and accepts traffic in well under a second. Each is registered
+# by name so /ready can report what is already warm.
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Lazy:
+    """
+    Thread-safe, build-on-first-use wrapper around `factory()`.
+
+    Attribute access is forwarded to the built object, so a Lazy
+    can stand in wherever the object itself was used. A failed
+    build is re-raised for `retry_after` seconds, then retried,
+    so an unreachable backend costs one attempt per window rather
+    than one per request.
+    """
+
+    def __init__(self, name: str, factory, retry_after: float = 30.0):
+        self.name = name
+        self._factory = factory
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self._value = None
+        self._ready = False
+        self._error = None
+        self._failed_at = 0.0
+        self._init_seconds = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self):
+        if self._ready:
+            return self._value
+
+        with self._lock:
+            if self._ready:
+                return self._value
+            if self._error is not None and time.monotonic() - self._failed_at < self._retry_after:
+                raise self._error
+
+            start = time.perf_counter()
+            try:
+                value = self._factory()
+            except Exception as e:
+                self._error = e
+                self._failed_at = time.monotonic()
+                print(f"❌ {self.name} init failed:", str(e))
+                raise
+
+            self._value = value
+            self._init_seconds = time.perf_counter() - start
+            self._error = None
+            self._ready = True
+            print(f"✅ {self.name} ready in {self._init_seconds:.2f}s")
+            return value
+
+    def status(self) -> dict:
+        return {
+            "ready": self._ready,
+            "init_ms": round(self._init_seconds * 1000, 1) if self._init_seconds is not None else None,
+            "error": str(self._error) if self._error is not None else None,
+        }
+
+    def __getattr__(self, attr):
+        # Only reached for attributes Lazy itself does not define
+        return getattr(self.get(), attr)
+
+
+def lazy(name: str, factory, retry_after: float = 30.0) -> Lazy:
+    """Registers (or returns the existing) named lazy component."""
+    with _registry_lock:
+        component = _registry.get(name)
+        if component is None:
+            component = _registry[name] = Lazy(name, factory, retry_after)
+        return component
+
+
+def readiness() -> dict:
+    with _registry_lock:
+        components = dict(_registry)
+    return {name: component.status() for name, component in components.items()}
+
+
+def warm_up(names=None):
+    """
+    Builds registered components (all, or `names` in order).
+    Failures are logged and left for the next caller to retry.
+    """
+    with _registry_lock:
+        components = dict(_registry)
+
+    for name in names or list(components):
+        component = components.get(name)
+        if component is None:
+            continue
+        try:
+            component.get()
+        except Exception:
+            pass
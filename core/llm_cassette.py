@@ -0,0 +1,357 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from core.metrics import LLM_CASSETTE
+from core.prompt_builder import hour_bucket
+
+
+# =========================
+# Record / replay cassette
+# =========================
+# With LLM_CASSETTE_MODE=record every chat-model call is forwarded and
+# its reply appended to a JSONL cassette. With =replay the reply is
+# served from the cassette instead, with its recorded latency scaled
+# by LLM_CASSETTE_LATENCY_SCALE (1 = original, 0 = instant), so
+# captured calls can be re-run through the graphs with no model and
+# only our own code on the clock.
+#
+# Calls are keyed by a hash of (role, model, messages, parameters).
+# A replay miss raises CassetteMiss; it is never sent to a live model.
+#
+# Context folds (core/context_window.py) run in the background, so
+# whether a turn is sent with the running summary or with its older
+# turns verbatim depends on timing. For the chat role the key
+# therefore drops the summary and every turn before the last
+# `keep_turns`, which are sent verbatim either way. Fold calls
+# themselves may miss on replay; a missed fold only leaves the turns
+# verbatim. The CALL CONTEXT time of day is left out of every key;
+# replay pins it to the recorded bucket so the scripted greeting
+# matches too (see core/prompt_builder.time_of_day).
+
+FOLD_SUMMARY_PREFIX = "### EARLIER IN THIS CALL"
+CALL_CONTEXT_PREFIX = "### CALL CONTEXT"
+TIME_OF_DAY_LINE = re.compile(r"^Time of day: .*$", re.MULTILINE)
+
+class CassetteMiss(LookupError):
+    def __init__(self, role: str, key: str, preview: str):
+        super().__init__(f"No cassette entry for {role} call {key[:12]} (last message: {preview!r})")
+        self.role = role
+        self.key = key
+        self.preview = preview
+
+
+def _message_key(message) -> dict:
+    if isinstance(message, BaseMessage):
+        return {"type": message.type, "content": message.content}
+    if isinstance(message, (tuple, list)) and len(message) == 2:
+        return {"type": message[0], "content": message[1]}
+    return {"type": "raw", "content": message}
+
+
+def _preview(messages) -> str:
+    if isinstance(messages, (str, BaseMessage)) or not messages:
+        messages = [messages]
+    content = _message_key(messages[-1])["content"]
+    return str(content)[:80]
+
+
+def _normalize(message: dict) -> dict:
+    """Drops the wall-clock time of day from the CALL CONTEXT message."""
+    content = message["content"]
+    if isinstance(content, str) and content.startswith(CALL_CONTEXT_PREFIX):
+        return {**message, "content": TIME_OF_DAY_LINE.sub("Time of day: *", content)}
+    return message
+
+
+def _window(messages: list, keep_turns: int) -> list:
+    """System messages minus the fold summary, then the last `keep_turns` turns."""
+    start = 0
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["type"] == "human":
+            seen += 1
+            if seen == keep_turns:
+                start = i
+                break
+
+    head = [
+        m for m in messages[:start]
+        if m["type"] == "system" and not str(m["content"]).startswith(FOLD_SUMMARY_PREFIX)
+    ]
+    tail = [m for m in messages[start:] if not str(m["content"]).startswith(FOLD_SUMMARY_PREFIX)]
+    return head + tail
+
+
+def request_key(role: str, model: str, messages, params: dict, keep_turns: int = 0) -> str:
+    if isinstance(messages, (str, BaseMessage)):
+        messages = [messages]
+    messages = [_normalize(_message_key(m)) for m in messages]
+    if keep_turns > 0:
+        messages = _window(messages, keep_turns)
+    payload = {
+        "role": role,
+        "model": model,
+        "messages": messages,
+        "params": params,
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Append-only JSONL store of recorded replies, one per line:
+
+        {"key", "role", "preview", "content", "latency_ms",
+         "chunks": [[offset_ms, text], ...], "usage", "recorded_at",
+         "time_of_day"}
+
+    `chunks` is only present for streamed calls. A key recorded twice
+    keeps its latest entry.
+    """
+
+    def __init__(self, path: str, max_misses: int = 50):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._misses = deque(maxlen=max_misses)
+        self._counts = {"hits": 0, "misses": 0, "recorded": 0}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def time_of_day(self):
+        """Bucket most entries were recorded in, or None."""
+        with self._lock:
+            buckets = Counter(e.get("time_of_day") for e in self._entries.values())
+        buckets.pop(None, None)
+        return buckets.most_common(1)[0][0] if buckets else None
+
+    def lookup(self, key: str, role: str, messages) -> dict:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._counts["hits"] += 1
+            else:
+                self._counts["misses"] += 1
+                self._misses.append({"role": role, "key": key[:12], "last_message": _preview(messages)})
+
+        if entry is None:
+            LLM_CASSETTE.inc(role=role, result="miss")
+            error = CassetteMiss(role, key, _preview(messages))
+            print("❌ Cassette miss:", str(error))
+            raise error
+
+        LLM_CASSETTE.inc(role=role, result="hit")
+        return entry
+
+    def record(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            self._counts["recorded"] += 1
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        LLM_CASSETTE.inc(role=entry["role"], result="recorded")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "entries": len(self._entries),
+                "recent_misses": list(self._misses),
+            }
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """One Cassette per file, shared by every role in the process."""
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path)
+        return cassette
+
+
+# =========================
+# Cassette LLM
+# =========================
+class CassetteLLM:
+    """
+    Chat-model wrapper that records to, or replays from, a Cassette.
+    Exposes the invoke / ainvoke / stream / astream / bind subset the
+    agents use. In replay mode `llm` may be None: no client is built
+    and nothing is sent over the network.
+    """
+
+    def __init__(self, llm, cassette: Cassette, role: str, model: str, params: dict = None,
+                 replay: bool = False, latency_scale: float = 1.0, keep_turns: int = 0):
+        self.llm = llm
+        self.cassette = cassette
+        self.role = role
+        self.model = model
+        self.params = params or {}
+        self.replay = replay
+        self.latency_scale = latency_scale
+        self.keep_turns = keep_turns
+
+    @property
+    def clients(self) -> list:
+        # Pre-warm targets; nothing to warm when replaying
+        if self.replay or self.llm is None:
+            return []
+        return list(getattr(self.llm, "clients", [self.llm]))
+
+    def bind(self, **kwargs):
+        bound = CassetteLLM.__new__(CassetteLLM)
+        bound.__dict__.update(self.__dict__)
+        bound.params = {**self.params, **kwargs}
+        if self.llm is not None:
+            bound.llm = self.llm.bind(**kwargs)
+        return bound
+
+    def stats(self) -> dict:
+        stats = {"cassette": self.cassette.stats()}
+        if self.llm is not None and hasattr(self.llm, "stats"):
+            stats.update(self.llm.stats())
+        return stats
+
+    def _key(self, messages, kwargs: dict) -> str:
+        return request_key(
+            self.role, self.model, messages, {**self.params, **kwargs}, self.keep_turns
+        )
+
+    def _delay(self, ms: float) -> float:
+        return max(0.0, (ms or 0) * self.latency_scale / 1000)
+
+    def _entry(self, key: str, messages, content: str, latency: float, usage, chunks=None) -> dict:
+        entry = {
+            "key": key,
+            "role": self.role,
+            "preview": _preview(messages),
+            "content": content,
+            "latency_ms": round(latency * 1000, 1),
+            "usage": usage or None,
+            "recorded_at": time.time(),
+            "time_of_day": hour_bucket(datetime.now().hour),
+        }
+        if chunks is not None:
+            entry["chunks"] = chunks
+        return entry
+
+    @staticmethod
+    def _message(entry: dict) -> AIMessage:
+        if entry.get("usage"):
+            return AIMessage(content=entry["content"], usage_metadata=entry["usage"])
+        return AIMessage(content=entry["content"])
+
+    @staticmethod
+    def _chunks(entry: dict) -> list:
+        """[(offset_ms, AIMessageChunk)], the last one carrying usage."""
+        chunks = entry.get("chunks") or [[entry.get("latency_ms") or 0, entry["content"]]]
+        replayed = [(offset, AIMessageChunk(content=text)) for offset, text in chunks]
+        if entry.get("usage"):
+            replayed.append((chunks[-1][0], AIMessageChunk(content="", usage_metadata=entry["usage"])))
+        return replayed
+
+    # ---------- sync ----------
+    def invoke(self, messages, **kwargs):
+        key = self._key(messages, kwargs)
+        if self.replay:
+            entry = self.cassette.lookup(key, self.role, messages)
+            time.sleep(self._delay(entry.get("latency_ms")))
+            return self._message(entry)
+
+        start = time.perf_counter()
+        response = self.llm.invoke(messages, **kwargs)
+        self.cassette.record(self._entry(
+            key, messages, response.content, time.perf_counter() - start,
+            getattr(response, "usage_metadata", None)
+        ))
+        return response
+
+    def stream(self, messages, **kwargs):
+        key = self._key(messages, kwargs)
+        if self.replay:
+            entry = self.cassette.lookup(key, self.role, messages)
+            start = time.perf_counter()
+            for offset, chunk in self._chunks(entry):
+                wait = self._delay(offset) - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+                yield chunk
+            return
+
+        start = time.perf_counter()
+        chunks, usage = [], None
+        for chunk in self.llm.stream(messages, **kwargs):
+            if chunk.content:
+                chunks.append([round((time.perf_counter() - start) * 1000, 1), chunk.content])
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self.cassette.record(self._entry(
+            key, messages, "".join(text for _, text in chunks),
+            time.perf_counter() - start, usage, chunks
+        ))
+
+    # ---------- async ----------
+    async def ainvoke(self, messages, **kwargs):
+        key = self._key(messages, kwargs)
+        if self.replay:
+            entry = self.cassette.lookup(key, self.role, messages)
+            await asyncio.sleep(self._delay(entry.get("latency_ms")))
+            return self._message(entry)
+
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, **kwargs)
+        self.cassette.record(self._entry(
+            key, messages, response.content, time.perf_counter() - start,
+            getattr(response, "usage_metadata", None)
+        ))
+        return response
+
+    async def astream(self, messages, **kwargs):
+        key = self._key(messages, kwargs)
+        if self.replay:
+            entry = self.cassette.lookup(key, self.role, messages)
+            start = time.perf_counter()
+            for offset, chunk in self._chunks(entry):
+                wait = self._delay(offset) - (time.perf_counter() - start)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                yield chunk
+            return
+
+        start = time.perf_counter()
+        chunks, usage = [], None
+        async for chunk in self.llm.astream(messages, **kwargs):
+            if chunk.content:
+                chunks.append([round((time.perf_counter() - start) * 1000, 1), chunk.content])
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self.cassette.record(self._entry(
+            key, messages, "".join(text for _, text in chunks),
+            time.perf_counter() - start, usage, chunks
+        ))
@@ -0,0 +1,219 @@
+import time
+import asyncio
+import threading
+
+import httpx
+from langchain_core.messages import HumanMessage
+
+from config.settings import (
+    LLM_PROVIDER,
+    LLM_API_KEY,
+    LLM_ENDPOINT,
+    LLM_API_VERSION,
+    LLM_DEPLOYMENT_NAME,
+    LLM_MODEL_NAME,
+    MAX_RESPONSE_TOKENS,
+    MAX_SUMMARY_TOKENS,
+    MAX_QUOTE_SUMMARY_TOKENS,
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_SECONDARY_ENDPOINT,
+    LLM_SECONDARY_DEPLOYMENT_NAME,
+    LLM_SECONDARY_API_KEY,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+    LLM_FAILOVER_COOLDOWN_SECONDS,
+    LLM_CASSETTE_MODE,
+    LLM_CASSETTE_PATH,
+    LLM_CASSETTE_LATENCY_SCALE,
+    CONTEXT_KEEP_TURNS,
+)
+from core.llm_router import HedgedLLM, Endpoint
+
+
+# =========================
+# Roles
+# =========================
+# Every agent asks for a client by role; all roles share one
+# keep-alive connection pool (sync + async) to the provider.
+ROLE_MAX_TOKENS = {
+    "chat": MAX_RESPONSE_TOKENS,
+    "summary": MAX_SUMMARY_TOKENS,
+    "quote_summary": MAX_QUOTE_SUMMARY_TOKENS,
+}
+
+_lock = threading.Lock()
+_clients = {}
+_http = {}
+
+
+def http_clients():
+    """Process-wide (httpx.Client, httpx.AsyncClient) pair."""
+    with _lock:
+        if not _http:
+            limits = httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS
+            )
+            timeout = httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=5.0)
+
+            _http["sync"] = httpx.Client(limits=limits, timeout=timeout)
+            _http["async"] = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        return _http["sync"], _http["async"]
+
+
+def _check_model(deployment: str):
+    """
+    Azure addresses a deployment, every other provider a model name.
+    Raised when a client is built (startup warm-up or first call),
+    instead of an opaque validation error from the client.
+    """
+    if LLM_PROVIDER == "azure" and not deployment:
+        raise RuntimeError(
+            "LLM_PROVIDER=azure needs LLM_DEPLOYMENT_NAME (or AZURE_DEPLOYMENT_NAME)"
+        )
+    if LLM_PROVIDER != "azure" and not (LLM_MODEL_NAME or deployment):
+        raise RuntimeError(
+            f"LLM_PROVIDER={LLM_PROVIDER} needs LLM_MODEL_NAME "
+            "(the model name the OpenAI-compatible endpoint serves)"
+        )
+
+
+def _build_client(endpoint: str, deployment: str, api_key: str, max_tokens: int):
+    _check_model(deployment)
+    http_client, http_async_client = http_clients()
+
+    if LLM_PROVIDER == "azure":
+        from langchain_openai import AzureChatOpenAI
+
+        return AzureChatOpenAI(
+            azure_deployment=deployment,
+            openai_api_key=api_key,
+            azure_endpoint=endpoint,
+            openai_api_version=LLM_API_VERSION,
+            max_tokens=max_tokens,
+            stream_usage=True,
+            http_client=http_client,
+            http_async_client=http_async_client
+        )
+
+    # Any OpenAI-compatible endpoint (hosted, sovereign or self-hosted)
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=LLM_MODEL_NAME or deployment,
+        api_key=api_key,
+        base_url=endpoint,
+        max_tokens=max_tokens,
+        stream_usage=True,
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+
+def _build(max_tokens: int):
+    primary = _build_client(LLM_ENDPOINT, LLM_DEPLOYMENT_NAME, LLM_API_KEY, max_tokens)
+
+    if not LLM_SECONDARY_ENDPOINT:
+        return primary
+
+    secondary = _build_client(
+        LLM_SECONDARY_ENDPOINT,
+        LLM_SECONDARY_DEPLOYMENT_NAME,
+        LLM_SECONDARY_API_KEY,
+        max_tokens
+    )
+    return HedgedLLM(
+        [Endpoint("primary", primary), Endpoint("secondary", secondary)],
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        default_hedge_delay=LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+        cooldown=LLM_FAILOVER_COOLDOWN_SECONDS
+    )
+
+
+def _build_cassette(role: str):
+    from core.llm_cassette import CassetteLLM, get_cassette
+
+    replay = LLM_CASSETTE_MODE == "replay"
+    return CassetteLLM(
+        # Replays never touch the network, so no client is built
+        None if replay else _build(ROLE_MAX_TOKENS[role]),
+        get_cassette(LLM_CASSETTE_PATH),
+        role,
+        model=LLM_MODEL_NAME or LLM_DEPLOYMENT_NAME,
+        params={"max_tokens": ROLE_MAX_TOKENS[role]},
+        replay=replay,
+        latency_scale=LLM_CASSETTE_LATENCY_SCALE,
+        # Chat turns are sent through the rolling context window
+        keep_turns=CONTEXT_KEEP_TURNS if role == "chat" else 0
+    )
+
+
+def get_llm(role: str = "chat"):
+    """Shared chat-model client for a role, built on first use."""
+    with _lock:
+        llm = _clients.get(role)
+    if llm is not None:
+        return llm
+
+    if LLM_CASSETTE_MODE in ("record", "replay"):
+        llm = _build_cassette(role)
+    else:
+        llm = _build(ROLE_MAX_TOKENS[role])
+    with _lock:
+        return _clients.setdefault(role, llm)
+
+
+# =========================
+# Pre-warming
+# =========================
+# A 1-token request per connection pays the DNS + TCP + TLS
+# handshake (and any provider-side cold start) before the first
+# real caller does.
+_PING = [HumanMessage(content="ping")]
+
+
+def _warm_targets() -> list:
+    # Warm every endpoint directly, not just the hedged winner
+    llm = get_llm("chat")
+    return [client.bind(max_tokens=1) for client in getattr(llm, "clients", [llm])]
+
+
+def prewarm(connections: int = 2):
+    """Warms the sync pool (summary workers, background threads)."""
+    def _ping(llm):
+        try:
+            llm.invoke(_PING)
+        except Exception as e:
+            print("❌ LLM pre-warm failed:", str(e))
+
+    start = time.time()
+    threads = [
+        threading.Thread(target=_ping, args=(llm,), daemon=True)
+        for llm in _warm_targets()
+        for _ in range(connections)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"✅ LLM sync pool pre-warmed ({connections} conns) in {time.time() - start:.2f}s")
+
+
+async def aprewarm(connections: int = 2):
+    """Warms the async pool used by request handlers."""
+    async def _ping(llm):
+        try:
+            await llm.ainvoke(_PING)
+        except Exception as e:
+            print("❌ LLM pre-warm failed:", str(e))
+
+    start = time.time()
+    await asyncio.gather(*(
+        _ping(llm) for llm in _warm_targets() for _ in range(connections)
+    ))
+    print(f"✅ LLM async pool pre-warmed ({connections} conns) in {time.time() - start:.2f}s")
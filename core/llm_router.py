@@ -0,0 +1,323 @@
+import time
+import asyncio
+import threading
+import contextvars
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+# =========================
+# Latency tracking
+# =========================
+class LatencyTracker:
+    """Rolling window of recent latencies (seconds) for one endpoint."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+
+class Endpoint:
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        self.latency = LatencyTracker()       # full completions
+        self.first_token = LatencyTracker()   # streaming time-to-first-token
+        self.failed_until = 0.0
+        self.stats = Counter()
+
+
+# =========================
+# Hedged LLM
+# =========================
+class HedgedLLM:
+    """
+    Routes chat-model calls across several endpoints/deployments.
+
+    Async calls go to the healthiest endpoint first. If it has not
+    answered by its recent p90 latency, the same request is also
+    sent to the next endpoint. The first success wins and the loser
+    is cancelled. Errors fail over to the next endpoint right away,
+    and a failing endpoint is deprioritized for `cooldown` seconds.
+    Sync calls (the Flask lending agent, background workers) hedge
+    the same way on a thread pool of `sync_workers`; a losing call
+    that already started cannot be interrupted, so it runs to
+    completion and its result (or open stream) is discarded.
+    """
+
+    def __init__(
+        self,
+        endpoints: list,
+        hedge_percentile: float = 90,
+        default_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.25,
+        max_hedge_delay: float = 8.0,
+        min_samples: int = 20,
+        cooldown: float = 30.0,
+        sync_workers: int = 32,
+    ):
+        self.endpoints = endpoints
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._bound = {}
+        self._pool = ThreadPoolExecutor(
+            max_workers=sync_workers,
+            thread_name_prefix="llm-hedge"
+        )
+
+    @property
+    def clients(self) -> list:
+        return [self._client(endpoint) for endpoint in self.endpoints]
+
+    def bind(self, **kwargs):
+        """Same endpoints (and latency history), extra call kwargs."""
+        bound = HedgedLLM.__new__(HedgedLLM)
+        bound.__dict__.update(self.__dict__)
+        bound._bound = {**self._bound, **kwargs}
+        return bound
+
+    # ---------- async ----------
+    async def ainvoke(self, messages, **kwargs):
+        async def call(endpoint):
+            start = time.perf_counter()
+            result = await self._client(endpoint).ainvoke(messages, **kwargs)
+            endpoint.latency.record(time.perf_counter() - start)
+            return result
+
+        return await self._race(call, lambda e: e.latency)
+
+    async def astream(self, messages, **kwargs):
+        async def first_chunk(endpoint):
+            start = time.perf_counter()
+            iterator = self._client(endpoint).astream(messages, **kwargs).__aiter__()
+            try:
+                chunk = await iterator.__anext__()
+            except BaseException:
+                await iterator.aclose()
+                raise
+            endpoint.first_token.record(time.perf_counter() - start)
+            return chunk, iterator
+
+        chunk, iterator = await self._race(
+            first_chunk,
+            lambda e: e.first_token,
+            discard=lambda result: asyncio.ensure_future(result[1].aclose())
+        )
+
+        # Once speech has started there is no clean failover
+        try:
+            yield chunk
+            async for chunk in iterator:
+                yield chunk
+        finally:
+            await iterator.aclose()
+
+    async def _race(self, call, tracker_of, discard=None):
+        order = self._order()
+        pending = {}
+        errors = []
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            endpoint = order[launched]
+            launched += 1
+            endpoint.stats["requests"] += 1
+            pending[asyncio.ensure_future(call(endpoint))] = endpoint
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if launched < len(order):
+                    timeout = self._hedge_delay(tracker_of(order[launched - 1]))
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Slower than its recent p90: hedge to the next endpoint
+                    order[launched].stats["hedged_to"] += 1
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    endpoint = pending.pop(task)
+                    if task.exception() is not None:
+                        self._mark_failed(endpoint, task.exception())
+                        errors.append(task.exception())
+                    elif winner is None:
+                        winner = (endpoint, task.result())
+                    elif discard is not None:
+                        discard(task.result())
+
+                if winner is not None:
+                    winner[0].stats["wins"] += 1
+                    return winner[1]
+
+                if not pending and launched < len(order):
+                    order[launched].stats["failover_to"] += 1
+                    launch()
+
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+                pending[task].stats["cancelled"] += 1
+
+    # ---------- sync ----------
+    def invoke(self, messages, **kwargs):
+        def call(endpoint):
+            start = time.perf_counter()
+            result = self._client(endpoint).invoke(messages, **kwargs)
+            endpoint.latency.record(time.perf_counter() - start)
+            return result
+
+        return self._race_sync(call, lambda e: e.latency)
+
+    def stream(self, messages, **kwargs):
+        def first_chunk(endpoint):
+            start = time.perf_counter()
+            iterator = iter(self._client(endpoint).stream(messages, **kwargs))
+            try:
+                chunk = next(iterator)
+            except BaseException:
+                iterator.close()
+                raise
+            endpoint.first_token.record(time.perf_counter() - start)
+            return chunk, iterator
+
+        chunk, iterator = self._race_sync(
+            first_chunk,
+            lambda e: e.first_token,
+            discard=lambda result: result[1].close()
+        )
+
+        # Once speech has started there is no clean failover
+        try:
+            yield chunk
+            yield from iterator
+        finally:
+            iterator.close()
+
+    def _race_sync(self, call, tracker_of, discard=None):
+        """_race on the thread pool, for sync callers."""
+        order = self._order()
+        pending = {}
+        errors = []
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            endpoint = order[launched]
+            launched += 1
+            endpoint.stats["requests"] += 1
+            # Keeps the caller's trace context inside the pool thread
+            context = contextvars.copy_context()
+            pending[self._pool.submit(context.run, call, endpoint)] = endpoint
+
+        def discard_late(future):
+            if not future.cancelled() and future.exception() is None:
+                discard(future.result())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if launched < len(order):
+                    timeout = self._hedge_delay(tracker_of(order[launched - 1]))
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Slower than its recent p90: hedge to the next endpoint
+                    order[launched].stats["hedged_to"] += 1
+                    launch()
+                    continue
+
+                winner = None
+                for future in done:
+                    endpoint = pending.pop(future)
+                    if future.exception() is not None:
+                        self._mark_failed(endpoint, future.exception())
+                        errors.append(future.exception())
+                    elif winner is None:
+                        winner = (endpoint, future.result())
+                    elif discard is not None:
+                        discard(future.result())
+
+                if winner is not None:
+                    winner[0].stats["wins"] += 1
+                    return winner[1]
+
+                if not pending and launched < len(order):
+                    order[launched].stats["failover_to"] += 1
+                    launch()
+
+            raise errors[-1]
+        finally:
+            for future in pending:
+                future.cancel()
+                pending[future].stats["cancelled"] += 1
+                if discard is not None:
+                    future.add_done_callback(discard_late)
+
+    # ---------- helpers ----------
+    def _client(self, endpoint):
+        return endpoint.client.bind(**self._bound) if self._bound else endpoint.client
+
+    def _order(self) -> list:
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.failed_until <= now]
+        cooling = [e for e in self.endpoints if e.failed_until > now]
+        return healthy + cooling
+
+    def _hedge_delay(self, tracker: LatencyTracker) -> float:
+        delay = self.default_hedge_delay
+        if len(tracker) >= self.min_samples:
+            delay = tracker.percentile(self.hedge_percentile)
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, delay))
+
+    def _mark_failed(self, endpoint, error):
+        endpoint.stats["errors"] += 1
+        endpoint.failed_until = time.monotonic() + self.cooldown
+        print(f"❌ LLM endpoint '{endpoint.name}' failed:", str(error))
+
+    def stats(self) -> dict:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            endpoint.name: {
+                **endpoint.stats,
+                "p50_ms": ms(endpoint.latency.percentile(50)),
+                "p90_ms": ms(endpoint.latency.percentile(90)),
+                "ttft_p90_ms": ms(endpoint.first_token.percentile(90)),
+                "cooling_down": endpoint.failed_until > time.monotonic(),
+            }
+            for endpoint in self.endpoints
+        }
@@ -0,0 +1,273 @@
+import time
+import asyncio
+import threading
+import functools
+from bisect import bisect_left
+
+
+# =========================
+# In-process metrics
+# =========================
+# Counters and fixed-bucket histograms aggregated in memory and
+# rendered in the Prometheus text format by the agents' /metrics
+# endpoint. Recording a sample costs a bisect and two additions
+# under a lock, and needs no client library or collector.
+
+# Finer between 0.5s and 3s, where LLM calls and whole turns land
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75,
+    1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0
+)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple, key: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {",".join(key) or "total": value for key, value in self._values.items()}
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # key -> [bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def quantile(self, q: float, counts: list) -> float:
+        """Linear interpolation inside the bucket, as histogram_quantile() does."""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def render(self) -> list:
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {round(total, 6)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+        def rounded(value):
+            return round(value, 4) if value is not None else None
+
+        return {
+            ",".join(key) or "total": {
+                "count": sum(counts),
+                "mean": rounded(total / sum(counts)) if sum(counts) else None,
+                "p50": rounded(self.quantile(0.50, counts)),
+                "p90": rounded(self.quantile(0.90, counts)),
+                "p99": rounded(self.quantile(0.99, counts)),
+            }
+            for key, (counts, total) in series.items()
+        }
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+# =========================
+# Registry
+# =========================
+_metrics = {}
+
+
+def counter(name: str, description: str, labelnames: tuple = ()) -> Counter:
+    return _metrics.setdefault(name, Counter(name, description, labelnames))
+
+
+def histogram(name: str, description: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return _metrics.setdefault(name, Histogram(name, description, labelnames, buckets))
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in _metrics.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_snapshot() -> dict:
+    """JSON view with p50/p90/p99 estimated from the histogram buckets."""
+    return {name: metric.snapshot() for name, metric in _metrics.items()}
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =========================
+# Agent metrics
+# =========================
+TURN_LATENCY = histogram(
+    "agent_turn_latency_seconds",
+    "End-to-end /chat turn latency",
+    ("mode",)
+)
+NODE_LATENCY = histogram(
+    "agent_node_latency_seconds",
+    "Latency of each LangGraph node",
+    ("node",)
+)
+LLM_LATENCY = histogram(
+    "llm_request_latency_seconds",
+    "Chat-model call latency, request to last token",
+    ("mode",)
+)
+LLM_TTFT = histogram(
+    "llm_time_to_first_token_seconds",
+    "Streamed chat-model time to first token"
+)
+LLM_PROMPT_TOKENS = histogram(
+    "llm_prompt_tokens",
+    "Prompt tokens per chat-model call",
+    buckets=TOKEN_BUCKETS
+)
+LLM_COMPLETION_TOKENS = histogram(
+    "llm_completion_tokens",
+    "Completion tokens per chat-model call",
+    buckets=TOKEN_BUCKETS
+)
+SUMMARY_JOB_LATENCY = histogram(
+    "agent_summary_job_seconds",
+    "Post-call summary job run time on the worker (mostly the summary LLM call)",
+    ("status",)
+)
+TURNS = counter(
+    "agent_turns_total",
+    "Completed turns by resulting call_status",
+    ("call_status",)
+)
+RETRIEVALS = counter(
+    "agent_retrievals_total",
+    "Knowledge retrievals by outcome (documents, empty, error)",
+    ("outcome",)
+)
+RETRIEVAL_CACHE = counter(
+    "agent_retrieval_cache_total",
+    "Retrieval document-cache lookups",
+    ("result",)
+)
+ANSWER_CACHE = counter(
+    "agent_answer_cache_total",
+    "Semantic answer-cache lookups (hit, miss, bypass, unsafe)",
+    ("result",)
+)
+ANSWER_CACHE_SAVED = counter(
+    "agent_answer_cache_saved_seconds_total",
+    "LLM generation time saved by answer-cache hits"
+)
+OPENING_TURNS = counter(
+    "agent_opening_turns_total",
+    "First turns answered from the pre-rendered greeting"
+)
+LLM_CASSETTE = counter(
+    "llm_cassette_total",
+    "Record/replay cassette lookups (hit, miss, recorded)",
+    ("role", "result")
+)
+
+
+def record_usage(message):
+    """Token counts from a LangChain AIMessage / final stream chunk, if reported."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("input_tokens") is not None:
+        LLM_PROMPT_TOKENS.observe(usage["input_tokens"])
+    if usage.get("output_tokens") is not None:
+        LLM_COMPLETION_TOKENS.observe(usage["output_tokens"])
+
+
+def timed_node(name: str):
+    """Decorator recording a (sync or async) graph node's latency."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with NODE_LATENCY.time(node=name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with NODE_LATENCY.time(node=name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
@@ -0,0 +1,110 @@
+import re
+import functools
+from datetime import datetime
+
+from langchain_core.messages import SystemMessage
+
+from core.contract import render_contract
+from core.prompt_builder import time_of_day
+
+
+# =========================
+# Opening Turn
+# =========================
+# The first agent utterance is scripted by both prompts, yet it used
+# to cost a full LLM call on the system prompt, right when a caller
+# who hears silence is most likely to hang up. When a call opens with
+# a plain "Hello?" the greeting is rendered from a template (name,
+# time of day, language) instead, with the usual contract attached,
+# and goes into the conversation as if the model had said it.
+# Anything more substantive than a greeting still goes to the model.
+
+OPENING_WORDS = {
+    "hello", "hallo", "helo", "hi", "hey", "hii", "haan", "han", "ha",
+    "haanji", "ji", "yes", "yeah", "yep", "namaste", "namaskar", "bolo",
+    "boliye", "speaking", "who", "is", "this", "it", "kaun", "hai", "good",
+    "morning", "afternoon", "evening", "sir", "madam", "ma'am", "ok", "okay",
+    "हैलो", "हेलो", "हलो", "नमस्ते", "नमस्कार", "हाँ", "हां", "जी", "हाँजी",
+    "बोलिए", "बोलो", "कौन", "है",
+}
+
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+WORD = re.compile(r"[\wऀ-ॿ']+")
+
+
+def detect_language(text: str) -> str:
+    """Script-level guess: Devanagari is Hindi, anything else English."""
+    return "Hindi" if DEVANAGARI.search(text or "") else "English"
+
+
+def is_system(message) -> bool:
+    """SystemMessage, or a client-supplied {"role"/"type": "system"} dict."""
+    if isinstance(message, SystemMessage):
+        return True
+    if isinstance(message, dict):
+        return message.get("role", message.get("type")) == "system"
+    return False
+
+
+def is_greeting(text: str, max_words: int = 6) -> bool:
+    words = WORD.findall((text or "").lower())
+    return 0 < len(words) <= max_words and all(w in OPENING_WORDS for w in words)
+
+
+class OpeningTurn:
+    """
+    Pre-rendered first reply for an agent.
+
+    `templates` maps a language to:
+
+        {
+            "named": "... {salutation} ... {name} ...",
+            "anonymous": "... {salutation} ...",   # name unknown
+            "salutations": {"morning": ..., "afternoon": ...,
+                            "evening": ..., "night": ...},
+        }
+
+    Callers speaking a language without a template get
+    `default_language`. Rendered replies are memoized per
+    (name, time-of-day bucket, language).
+    """
+
+    def __init__(self, templates: dict, default_language: str = "English",
+                 anonymous_names=("", "Customer"), cache_size: int = 1024):
+        self.templates = templates
+        self.default_language = default_language
+        self.anonymous_names = set(anonymous_names)
+        self._render = functools.lru_cache(maxsize=cache_size)(self._render_reply)
+
+    def reply(self, conversation: list, name: str, user_message: str,
+              language: str = None, now: datetime = None):
+        """
+        The contract-formatted greeting if this is the first turn of
+        the call and the caller only said hello, else None.
+
+        `conversation` already holds this turn's user message. Any
+        other non-system entry, including the plain dicts of a
+        session seeded from a client-supplied conversation, means
+        the call is already under way.
+        """
+        if sum(1 for m in conversation if not is_system(m)) > 1:
+            return None
+        if not is_greeting(user_message):
+            return None
+
+        language = language or detect_language(user_message)
+        if language not in self.templates:
+            language = self.default_language
+        bucket = time_of_day(now)
+        return self._render((name or "").strip(), bucket, language)
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+    def _render_reply(self, name: str, bucket: str, language: str) -> str:
+        template = self.templates[language]
+        if name in self.anonymous_names:
+            speech = template["anonymous"].format(salutation=template["salutations"][bucket])
+        else:
+            speech = template["named"].format(salutation=template["salutations"][bucket], name=name)
+        return render_contract(speech, "ONGOING", language)
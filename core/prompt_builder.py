@@ -0,0 +1,81 @@
+import functools
+from datetime import datetime
+
+from langchain_core.messages import SystemMessage
+
+from config.settings import LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_CASSETTE_TIME_OF_DAY
+
+
+CONTEXT_POINTER = "(Provided in the CALL CONTEXT message that follows this prompt.)"
+
+
+def hour_bucket(hour: int) -> str:
+    """
+    Coarse time of day. Bucketing (rather than the raw hour)
+    keeps the number of distinct rendered prompts small.
+    """
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 21:
+        return "evening"
+    return "night"
+
+
+def time_of_day(now: datetime = None) -> str:
+    """
+    Bucket for `now` (default: the current time). While a cassette
+    replays it is pinned (LLM_CASSETTE_TIME_OF_DAY, else the bucket
+    the cassette was recorded in), so the greeting and prompts match
+    the recording whatever the clock says.
+    """
+    if now is None and LLM_CASSETTE_MODE == "replay":
+        from core.llm_cassette import get_cassette
+
+        pinned = LLM_CASSETTE_TIME_OF_DAY or get_cassette(LLM_CASSETTE_PATH).time_of_day
+        if pinned:
+            return pinned
+    return hour_bucket((now or datetime.now()).hour)
+
+
+# =========================
+# Prompt Builder
+# =========================
+class PromptBuilder:
+    """
+    Compiles a system prompt template once at startup.
+
+    The template becomes a byte-stable static SystemMessage shared
+    by every call, so provider-side prefix caching can hit. Per-call
+    variables (name, time of day, injected data) go into a second,
+    trailing SystemMessage whose rendered variants are memoized.
+    """
+
+    def __init__(self, template: str, placeholders=(), cache_size: int = 1024):
+        static = template
+        for placeholder in placeholders:
+            static = static.replace(placeholder, CONTEXT_POINTER)
+
+        self.static_message = SystemMessage(content=static)
+        self._render = functools.lru_cache(maxsize=cache_size)(self._render_context)
+
+    def messages(self, name: str, extra_context: str = "", now: datetime = None) -> list:
+        """Returns [static prefix, call context] for a new conversation."""
+        bucket = time_of_day(now)
+        return [self.static_message, self._render(name, bucket, extra_context)]
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+    @staticmethod
+    def _render_context(name: str, bucket: str, extra_context: str) -> SystemMessage:
+        content = (
+            "### CALL CONTEXT\n\n"
+            f"Customer name: {name}\n"
+            f"Time of day: {bucket}\n"
+        )
+        if extra_context:
+            content += "\n" + extra_context.strip() + "\n"
+
+        return SystemMessage(content=content)
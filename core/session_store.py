@@ -0,0 +1,92 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+
+# =========================
+# Session
+# =========================
+class Session:
+    """
+    Server-side state for a single live call.
+    The conversation is only mutated while `lock` is held
+    (or `async_lock`, for apps running on an event loop).
+    """
+
+    def __init__(self, session_id: str, conversation: list):
+        self.session_id = session_id
+        self.conversation = conversation
+        self.call_status = "ONGOING"
+        self.language = None
+        self.lock = threading.Lock()
+        self.async_lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+
+
+# =========================
+# Session Store
+# =========================
+class SessionStore:
+    """
+    Bounded in-process session store keyed by session_id.
+
+    Sessions are kept in access order, so the least recently
+    used session is evicted first once `max_sessions` is reached
+    and sessions idle for longer than `idle_ttl` seconds expire.
+    """
+
+    def __init__(self, max_sessions: int = 5000, idle_ttl: float = 900):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: str, conversation_factory):
+        """
+        Returns the existing session, or creates one whose
+        conversation is built by `conversation_factory()`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, conversation_factory())
+                self._sessions[session_id] = session
+
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.last_access = now
+            return session
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire(self, now: float):
+        # Access order == idle order, so expired sessions sit at the front.
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access <= self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
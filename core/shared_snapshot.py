@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process leads
+    fcntl = None
+
+
+# =========================
+# Shared Snapshot
+# =========================
+class SharedSnapshot:
+    """
+    A JSON value shared by every worker process on one host.
+
+    Exactly one process, the leader, computes and writes it. The
+    leader is whoever holds an exclusive flock on `<path>.lock`; the
+    OS releases the lock when that process exits, so a surviving
+    worker can take over. Each write goes to a temp file that is then
+    atomically renamed over `path`. Readers therefore never take a
+    lock and never see a partial snapshot. They re-parse the file
+    only when its inode or mtime changes.
+
+    Entries look like {"version": int, "written_at": float, "data": ...}.
+    The version grows by one on every write, so workers can tell
+    whether they are serving the same value.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock_fd = None
+        self._lead_lock = threading.Lock()
+        self._cached = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_lead(self) -> bool:
+        """Non-blocking; once acquired, held for the process lifetime."""
+        with self._lead_lock:
+            if self._lock_fd is not None:
+                return True
+            if fcntl is None:
+                self._lock_fd = -1
+                return True
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+
+            self._lock_fd = fd
+            return True
+
+    def read(self):
+        """Latest entry, or None if nothing has been written yet."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._cached
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with open(self.path, encoding="utf-8") as f:
+            entry = json.load(f)
+        self._cached = (key, entry)
+        return entry
+
+    def write(self, data) -> int:
+        """Publishes `data` atomically; returns the new version."""
+        previous = self.read()
+        entry = {
+            "version": (previous or {}).get("version", 0) + 1,
+            "written_at": time.time(),
+            "data": data,
+        }
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return entry["version"]
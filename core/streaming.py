@@ -0,0 +1,103 @@
+import re
+import json
+
+from core.contract import (
+    split_contract,
+    strip_fence_open,
+    normalize_call_status,
+    DEFAULT_CALL_STATUS,
+)
+
+
+# Sentence boundary: terminal punctuation (incl. Devanagari danda),
+# optional closing quotes/brackets, then whitespace.
+SENTENCE_END = re.compile(r'[.!?।]["\'”’)\]]*\s+')
+
+
+# =========================
+# Incremental stream parser
+# =========================
+class ContractStreamParser:
+    """
+    Splits streamed model tokens into sentence-sized chunks for TTS.
+
+    Everything from the first "{" onward is held back as the
+    candidate contract trailer so it is never spoken. If it turns
+    out not to be a contract, it is released as speech on finish().
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._speech = ""
+        self._trailer = None
+        self.payload = None
+
+    @property
+    def text(self) -> str:
+        """Full raw model output seen so far."""
+        return "".join(self._parts)
+
+    @property
+    def call_status(self) -> str:
+        if self.payload is None:
+            return DEFAULT_CALL_STATUS
+        return normalize_call_status(self.payload.get("call_status"))
+
+    @property
+    def language(self):
+        return (self.payload or {}).get("language")
+
+    def feed(self, token: str) -> list:
+        """Consumes one streamed token, returns completed sentences."""
+        if not token:
+            return []
+
+        self._parts.append(token)
+
+        if self._trailer is not None:
+            self._trailer += token
+            return []
+
+        brace = token.find("{")
+        if brace == -1:
+            self._speech += token
+        else:
+            self._speech += token[:brace]
+            self._trailer = token[brace:]
+
+        return self._drain()
+
+    def finish(self) -> list:
+        """Flushes remaining speech and parses the held-back trailer."""
+        if self._trailer is not None:
+            speech, self.payload = split_contract(self._trailer)
+            if self.payload is None:
+                self._speech += self._trailer
+            else:
+                self._speech = strip_fence_open(self._speech)
+                if speech:
+                    self._speech += " " + speech
+            self._trailer = None
+
+        rest = self._speech.strip()
+        self._speech = ""
+        return [rest] if rest else []
+
+    def _drain(self) -> list:
+        boundary = None
+        for boundary in SENTENCE_END.finditer(self._speech):
+            pass
+
+        if boundary is None:
+            return []
+
+        ready = self._speech[:boundary.end()].strip()
+        self._speech = self._speech[boundary.end():]
+        return [ready] if ready else []
+
+
+# =========================
+# Server-Sent Events
+# =========================
+def sse_event(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
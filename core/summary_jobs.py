@@ -0,0 +1,124 @@
+import time
+import queue
+import threading
+from collections import OrderedDict
+from uuid import uuid4
+
+import requests
+
+from core.metrics import SUMMARY_JOB_LATENCY
+
+# =========================
+# Summary Job Queue
+# =========================
+class SummaryJobQueue:
+    """
+    Bounded background worker pool for post-call summarization.
+
+    The final /chat turn submits the finished conversation and
+    returns immediately with a job id. Results are kept per
+    session_id for polling and, if `webhook_url` is set, POSTed
+    there once the job completes. The job body is timed here
+    (`agent_summary_job_seconds`, `duration_seconds` on the job):
+    the summarize node on the request path only measures submission.
+    """
+
+    def __init__(
+        self,
+        summarize,
+        workers: int = 2,
+        max_pending: int = 100,
+        max_results: int = 5000,
+        webhook_url: str = None,
+        webhook_timeout: float = 5.0,
+    ):
+        self._summarize = summarize
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_results = max_results
+        self.webhook_url = webhook_url
+        self.webhook_timeout = webhook_timeout
+
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker,
+                name=f"summary-worker-{i}",
+                daemon=True
+            ).start()
+
+    def submit(self, session_id: str, conversation: list) -> str:
+        job = {
+            "job_id": str(uuid4()),
+            "session_id": session_id,
+            "status": "queued",
+            "summary": None,
+            "error": None,
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "duration_seconds": None,
+        }
+        self._store(job)
+
+        try:
+            # Snapshot: the live session may be evicted or reused
+            self._queue.put_nowait((job, list(conversation)))
+        except queue.Full:
+            print("❌ Summary queue full, rejecting job for", session_id)
+            self._finish(job, "rejected", error="summary queue full")
+
+        return job["job_id"]
+
+    def get(self, session_id: str):
+        with self._lock:
+            job = self._jobs.get(session_id)
+            return dict(job) if job else None
+
+    def _store(self, job: dict):
+        with self._lock:
+            self._jobs[job["session_id"]] = job
+            self._jobs.move_to_end(job["session_id"])
+
+            while len(self._jobs) > self.max_results:
+                self._jobs.popitem(last=False)
+
+    def _finish(self, job: dict, status: str, summary=None, error=None, duration: float = None):
+        with self._lock:
+            job["status"] = status
+            job["summary"] = summary
+            job["error"] = error
+            job["finished_at"] = time.time()
+            if duration is not None:
+                job["duration_seconds"] = round(duration, 3)
+            payload = dict(job)
+
+        if self.webhook_url:
+            try:
+                requests.post(
+                    self.webhook_url,
+                    json=payload,
+                    timeout=self.webhook_timeout
+                )
+            except Exception as e:
+                print("❌ Summary webhook failed:", str(e))
+
+    def _worker(self):
+        while True:
+            job, conversation = self._queue.get()
+
+            with self._lock:
+                job["status"] = "running"
+
+            start = time.perf_counter()
+            try:
+                summary = self._summarize(conversation)
+                duration = time.perf_counter() - start
+                SUMMARY_JOB_LATENCY.observe(duration, status="done")
+                self._finish(job, "done", summary=summary, duration=duration)
+            except Exception as e:
+                duration = time.perf_counter() - start
+                SUMMARY_JOB_LATENCY.observe(duration, status="failed")
+                print("❌ Summary job failed:", str(e))
+                self._finish(job, "failed", error=str(e), duration=duration)
+            finally:
+                self._queue.task_done()
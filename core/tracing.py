@@ -0,0 +1,348 @@
+import os
+import re
+import json
+import time
+import random
+import pstats
+import asyncio
+import cProfile
+import importlib
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+from config.settings import (
+    TRACING_EXPORTER,
+    TRACING_JSONL_PATH,
+    TRACE_SAMPLE_RATE,
+    TRACE_PROFILE_SAMPLE_RATE,
+    TRACE_PROFILE_MIN_MS,
+    TRACE_PROFILE_DIR,
+)
+
+
+# =========================
+# Per-turn tracing
+# =========================
+# One trace per /chat turn. The trace id comes from the caller's
+# W3C `traceparent` (or `X-Trace-Id`) header when the telephony side
+# sends one, so an ASR -> agent -> TTS hop shares a single id, and is
+# echoed back on the response. Spans (request parsing, graph nodes,
+# LLM and retriever calls, serialization) are kept in memory for the
+# turn and handed to the exporter once, when the turn finishes.
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_ID_HEADER = "X-Trace-Id"
+
+# Caller-supplied ids end up in file names (profiles) and logs
+VALID_TRACE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+# Only these may go into a traceparent; any other X-Trace-Id (e.g.
+# "call-123") is echoed in X-Trace-Id alone
+W3C_TRACE_ID = re.compile(r"(?!0{32})[0-9a-f]{32}")
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# cProfile is per-interpreter; profile one turn at a time
+_profile_lock = threading.Lock()
+
+
+def _new_id(hex_chars: int) -> str:
+    return f"{random.getrandbits(hex_chars * 4):0{hex_chars}x}"
+
+
+def parse_traceparent(value: str):
+    """Returns (trace_id, parent_span_id, sampled) or None if malformed."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32:
+        return None
+    return parts[1].lower(), parts[2].lower(), bool(flags & 1)
+
+
+# =========================
+# Exporters
+# =========================
+class JsonlExporter:
+    """Appends one JSON span per line; works fully offline."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, spans: list):
+        lines = "".join(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class ConsoleExporter:
+    def export(self, spans: list):
+        for span in spans:
+            print(
+                f">>> [Trace {span['trace_id'][:8]}] {span['name']} "
+                f"{span['duration_ms']:.1f}ms {span['status']}"
+            )
+
+
+def build_exporter(name: str):
+    """`none`, `jsonl`, `console`, or `package.module:factory` for a custom exporter."""
+    if not name or name == "none":
+        return None
+    if name == "jsonl":
+        return JsonlExporter(TRACING_JSONL_PATH)
+    if name == "console":
+        return ConsoleExporter()
+
+    module_name, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+_exporter = build_exporter(TRACING_EXPORTER)
+
+
+def set_exporter(exporter):
+    """Anything with an `export(spans: list)` method, or None to disable."""
+    global _exporter
+    _exporter = exporter
+
+
+# =========================
+# Traces and spans
+# =========================
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "status", "start", "_t0", "duration_ms")
+
+    def __init__(self, trace, name: str, parent_id: str, attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id(16)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, error: BaseException = None):
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        self.trace._record(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """
+    One turn's trace. Unsampled traces still carry (and echo) the
+    trace id, but record no spans.
+    """
+
+    def __init__(self, trace_id: str, parent_id: str, sampled: bool, profile: bool):
+        self.trace_id = trace_id
+        self.w3c_trace_id = trace_id if W3C_TRACE_ID.fullmatch(trace_id) else _new_id(32)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.root = None
+        self._spans = []
+        self._finished = False
+        self._profiler = None
+
+        if profile and _profile_lock.acquire(blocking=False):
+            try:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this interpreter
+                self._profiler = None
+                _profile_lock.release()
+
+    @property
+    def traceparent(self) -> str:
+        span_id = self.root.span_id if self.root is not None else _new_id(16)
+        return f"00-{self.w3c_trace_id}-{span_id}-{'01' if self.sampled else '00'}"
+
+    def set(self, **attributes):
+        """Attributes on the turn's root span (no-op when unsampled)."""
+        if self.root is not None:
+            self.root.set(**attributes)
+
+    def response_headers(self) -> dict:
+        return {TRACE_ID_HEADER: self.trace_id, TRACEPARENT_HEADER: self.traceparent}
+
+    @contextmanager
+    def activate(self):
+        """Makes this trace (and its root span) current for the block."""
+        trace_token = _current_trace.set(self)
+        span_token = _current_span.set(self.root)
+        try:
+            yield self
+        finally:
+            try:
+                _current_span.reset(span_token)
+                _current_trace.reset(trace_token)
+            except ValueError:
+                # A streamed response closed from another context
+                pass
+
+    def _record(self, span: Span):
+        if not self._finished:
+            self._spans.append(span)
+
+    def finish(self, error: BaseException = None, **attributes):
+        if self._finished:
+            return
+        if self.root is not None:
+            self.root.set(**attributes)
+            self.root.end(error)
+        self._finished = True
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profile_lock.release()
+            self._save_profile()
+
+        if self.sampled and _exporter is not None and self._spans:
+            try:
+                _exporter.export([span.to_dict() for span in self._spans])
+            except Exception as e:
+                print("❌ Trace export failed:", str(e))
+
+    def _save_profile(self):
+        duration_ms = self.root.duration_ms if self.root is not None else 0
+        if duration_ms < TRACE_PROFILE_MIN_MS:
+            return
+        os.makedirs(TRACE_PROFILE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_PROFILE_DIR, f"{self.trace_id}.prof")
+        pstats.Stats(self._profiler).dump_stats(path)
+        self.root.attributes["profile"] = path
+        print(f">>> [Trace {self.trace_id[:8]}] Slow turn ({duration_ms:.0f}ms) profiled to {path}")
+
+
+def begin_trace(name: str, headers, **attributes) -> Trace:
+    """
+    Starts a turn's trace from the incoming request headers. Turns
+    are sampled at TRACE_SAMPLE_RATE when an exporter is set; an
+    upstream `traceparent` with the sampled flag always is.
+    """
+    parsed = parse_traceparent(headers.get(TRACEPARENT_HEADER))
+    if parsed is not None:
+        trace_id, parent_id, sampled = parsed
+        sampled = sampled or random.random() < TRACE_SAMPLE_RATE
+    else:
+        trace_id = (headers.get(TRACE_ID_HEADER) or "").strip()
+        if not VALID_TRACE_ID.fullmatch(trace_id):
+            trace_id = _new_id(32)
+        parent_id = None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+
+    trace = Trace(
+        trace_id,
+        parent_id,
+        sampled=sampled and _exporter is not None,
+        profile=random.random() < TRACE_PROFILE_SAMPLE_RATE
+    )
+    if trace.w3c_trace_id != trace_id:
+        # Lets spans keyed on the caller's id be found from the traceparent
+        attributes = {**attributes, "w3c_trace_id": trace.w3c_trace_id}
+    if trace.sampled or trace._profiler is not None:
+        trace.root = Span(trace, name, parent_id, attributes)
+    return trace
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one; a no-op outside a sampled trace."""
+    trace = _current_trace.get()
+    if trace is None or trace.root is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(trace, name, parent.span_id if parent else trace.root.span_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(e)
+        raise
+    else:
+        current.end()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator wrapping a (sync or async) function in a span."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def trace_stream(trace: Trace, events):
+    """Runs a streamed (sync) response inside `trace`, finishing it at the end."""
+    error = None
+    try:
+        with trace.activate():
+            yield from events
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.finish(error)
+
+
+async def trace_async_stream(trace: Trace, events):
+    """Async twin of trace_stream() for StreamingResponse bodies."""
+    error = None
+    try:
+        with trace.activate():
+            async for event in events:
+                yield event
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.finish(error)
+
+
+def current_trace_id():
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
@@ -0,0 +1,292 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from config.settings import (
+    ENABLE_ANSWER_CACHE,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL_SECONDS,
+)
+from core.contract import parse_contract
+from core.metrics import timed_node, ANSWER_CACHE, ANSWER_CACHE_SAVED
+from core.tracing import span, traced
+from .rag import embed_query, current_index_version
+
+
+# =========================
+# Quotation safeguards
+# =========================
+# A caller's quote (premium, IDV, discounts) is injected into their
+# CALL CONTEXT message. Answers are shared across callers, so any
+# answer that mentions money, repeats a figure from either the storing
+# or the serving caller's context, or addresses the caller by name is
+# never cached or served. Questions about the caller's own quote
+# bypass the cache entirely.
+
+QUOTE_TERMS = {
+    "my", "mine", "quote", "quotation", "quoted", "premium", "price",
+    "cost", "amount", "discount", "offer", "mera", "meri", "mere",
+}
+
+MONEY = re.compile(
+    r"₹|\brs\b\.?|\binr\b|\brupees?\b|\blakhs?\b|\blacs?\b|\bcrores?\b|\$"
+    # Shorthand amounts: the quote renders the IDV as "₹4.2L – ₹4.5L"
+    r"|\b\d[\d,]*(?:\.\d+)?\s?(?:l|k|cr)\b",
+    re.IGNORECASE
+)
+FIGURE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+WORD = re.compile(r"[a-z]+")
+CUSTOMER_NAME = re.compile(r"^Customer name: (.+)$", re.MULTILINE)
+
+
+def figures(text: str) -> set:
+    """
+    Numbers of two or more digits and every decimal, commas dropped
+    ("45,000" -> "45000", "₹4.2L" -> "4.2").
+    """
+    values = {match.replace(",", "").rstrip(".") for match in FIGURE.findall(text or "")}
+    return {value for value in values if len(value.split(".")[0]) >= 2 or "." in value}
+
+
+def call_context(conversation: list) -> str:
+    """The session's CALL CONTEXT message (name, time of day, quotation)."""
+    return "\n".join(
+        m.content for m in conversation
+        if isinstance(m, SystemMessage) and m.content.startswith("### CALL CONTEXT")
+    )
+
+
+def quote_figures(conversation: list) -> set:
+    return figures(call_context(conversation))
+
+
+def is_quote_question(text: str) -> bool:
+    return bool(QUOTE_TERMS.intersection(WORD.findall((text or "").lower())))
+
+
+def is_shareable(speech: str, conversation: list) -> bool:
+    """True if `speech` carries nothing specific to this caller."""
+    if MONEY.search(speech):
+        return False
+    context = call_context(conversation)
+    if figures(speech) & figures(context):
+        return False
+    for name in CUSTOMER_NAME.findall(context):
+        name = name.strip()
+        if name and name != "Customer" and re.search(rf"\b{re.escape(name)}\b", speech, re.IGNORECASE):
+            return False
+    return True
+
+
+def stage_fingerprint(conversation: list) -> str:
+    """
+    Coarse conversation stage: the same question early in a call
+    (before details are captured) and late in it get different
+    answers, as do callers with and without a quote on file.
+    """
+    turns = sum(1 for m in conversation if isinstance(m, HumanMessage))
+    stage = "early" if turns <= 2 else "mid" if turns <= 6 else "late"
+    quoted = "quoted" if quote_figures(conversation) else "unquoted"
+    return f"{stage}|{quoted}"
+
+
+# =========================
+# Semantic Answer Cache
+# =========================
+class SemanticAnswerCache:
+    """
+    Bounded, TTL'd cache of model replies keyed by query embedding
+    and conversation stage. A lookup returns the closest entry of the
+    same stage if its cosine similarity reaches `threshold`.
+    Vectors of a stage are stacked into one matrix, rebuilt only
+    after that stage's entries change.
+    """
+
+    def __init__(self, threshold: float = 0.93, max_entries: int = 512, ttl: float = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # id -> entry (LRU order)
+        self._stages = {}               # stage -> [ids], matrix
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counts = {
+            "hits": 0, "misses": 0, "bypassed": 0, "unsafe": 0,
+            "stored": 0, "saved_seconds": 0.0,
+        }
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _matrix(self, stage: str):
+        ids, matrix = self._stages.get(stage, ([], None))
+        if matrix is None and ids:
+            matrix = np.stack([self._entries[i]["vector"] for i in ids])
+            self._stages[stage] = (ids, matrix)
+        return ids, matrix
+
+    def _drop(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        ids, _ = self._stages[entry["stage"]]
+        ids.remove(entry_id)
+        self._stages[entry["stage"]] = (ids, None)
+
+    def _closest(self, vector: np.ndarray, stage: str):
+        """(entry_id, similarity) of the nearest live entry, or (None, 0)."""
+        now = time.monotonic()
+        ids, _ = self._stages.get(stage, ([], None))
+        for entry_id in [i for i in ids if self._entries[i]["expires_at"] <= now]:
+            self._drop(entry_id)
+
+        ids, matrix = self._matrix(stage)
+        if matrix is None:
+            return None, 0.0
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return ids[best], float(scores[best])
+
+    def lookup(self, vector, stage: str):
+        """The cached entry for a close enough query, or None."""
+        vector = self._unit(vector)
+        with self._lock:
+            entry_id, similarity = self._closest(vector, stage)
+            if entry_id is None or similarity < self.threshold:
+                return None
+            self._entries.move_to_end(entry_id)
+            entry = self._entries[entry_id]
+            entry["hits"] += 1
+            return {**entry, "similarity": round(similarity, 4)}
+
+    def store(self, vector, stage: str, answer: str, generation_seconds: float):
+        vector = self._unit(vector)
+        with self._lock:
+            entry_id, similarity = self._closest(vector, stage)
+            if entry_id is not None and similarity >= self.threshold:
+                # Near-duplicate question: keep one entry, refresh it
+                self._drop(entry_id)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "vector": vector,
+                "stage": stage,
+                "answer": answer,
+                "generation_seconds": generation_seconds,
+                "expires_at": time.monotonic() + self.ttl,
+                "hits": 0,
+            }
+            ids, _ = self._stages.get(stage, ([], None))
+            ids.append(entry_id)
+            self._stages[stage] = (ids, None)
+            self._counts["stored"] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def record(self, result: str, saved_seconds: float = 0.0):
+        """Counts a lookup outcome: hits, misses, bypassed or unsafe."""
+        with self._lock:
+            self._counts[result] += 1
+            self._counts["saved_seconds"] += saved_seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stages.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"] + self._counts["unsafe"]
+            return {
+                **self._counts,
+                "saved_seconds": round(self._counts["saved_seconds"], 3),
+                "size": len(self._entries),
+                "hit_rate": round(self._counts["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=ANSWER_CACHE_THRESHOLD,
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl=ANSWER_CACHE_TTL_SECONDS
+)
+
+
+# =========================
+# Graph hooks
+# =========================
+@timed_node("answer_cache")
+@traced("node.answer_cache")
+async def answer_cache_node(state):
+    """
+    Runs on knowledge-question turns, before retrieval. A hit is
+    served through the prefetched-response path (no retrieval, no
+    LLM call); a miss leaves what remember_answer() needs to store
+    the generated reply.
+    """
+    if not ENABLE_ANSWER_CACHE:
+        return {"answer_cache_key": None}
+
+    conversation = state["conversation"]
+    query = next((m.content for m in reversed(conversation) if isinstance(m, HumanMessage)), "")
+    if is_quote_question(query):
+        answer_cache.record("bypassed")
+        ANSWER_CACHE.inc(result="bypass")
+        return {"answer_cache_key": None}
+
+    try:
+        vector = await embed_query(query)
+    except Exception as e:
+        print(">>> [Answer Cache] Embedding failed:", str(e))
+        return {"answer_cache_key": None}
+
+    # The index version makes a re-index on any worker retire every
+    # worker's answers generated from the old documents
+    stage = f"{stage_fingerprint(conversation)}|v{current_index_version()}"
+    with span("answer_cache.lookup", stage=stage) as current:
+        entry = answer_cache.lookup(vector, stage)
+        if current is not None:
+            current.set(hit=entry is not None)
+
+    miss = {"answer_cache_key": {"vector": vector, "stage": stage}}
+    if entry is None:
+        answer_cache.record("misses")
+        ANSWER_CACHE.inc(result="miss")
+        return miss
+
+    speech, _, _ = parse_contract(entry["answer"])
+    if not is_shareable(speech, conversation):
+        # e.g. the cached answer repeats a figure from this caller's quote
+        answer_cache.record("unsafe")
+        ANSWER_CACHE.inc(result="unsafe")
+        return miss
+
+    answer_cache.record("hits", entry["generation_seconds"])
+    ANSWER_CACHE.inc(result="hit")
+    ANSWER_CACHE_SAVED.inc(entry["generation_seconds"])
+    print(f">>> [Answer Cache] Hit (similarity={entry['similarity']}, stage={stage})")
+    return {"answer_cache_key": None, "prefetched_response": entry["answer"]}
+
+
+def remember_answer(state, content: str, generation_seconds: float):
+    """Stores a freshly generated reply if the turn was a cache miss and the reply is safe to share."""
+    key = state.get("answer_cache_key")
+    if not key:
+        return
+
+    speech, call_status, language = parse_contract(content)
+    if call_status != "ONGOING" or language is None or not speech:
+        # Closing turns and replies without a parsed trailer are not reused
+        return
+    if not is_shareable(speech, state["conversation"]):
+        return
+
+    answer_cache.store(key["vector"], key["stage"], content, generation_seconds)
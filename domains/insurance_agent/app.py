@@ -1,43 +1,131 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .rag import rag_node
-from .quotation import start_quotation_loader
+from .rag import rag_node, invalidate_retrieval_cache, retrieval_cache_stats
+from .router import route_retrieval, router_stats
+from .answer_cache import answer_cache, answer_cache_node, remember_answer
+from .speculation import SpeculativePrefetcher
+from .quotation import start_quotation_loader, QuotationCache
 
-from datetime import datetime
 from uuid import uuid4
-import re, json, time, os
+import re, time, os, asyncio
 
-from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
 from typing_extensions import TypedDict
 
-from .prompt import SYSTEM_PROMPT
+from .prompt import SYSTEM_PROMPT, OPENING_TEMPLATES
+from config.settings import (
+    SESSION_MAX_ENTRIES,
+    SESSION_IDLE_TTL_SECONDS,
+    SUMMARY_WORKERS,
+    SUMMARY_QUEUE_SIZE,
+    SUMMARY_RESULT_RETENTION,
+    SUMMARY_WEBHOOK_URL,
+    CONTEXT_KEEP_TURNS,
+    CONTEXT_FOLD_BATCH_TURNS,
+    SPECULATIVE_MATCH_THRESHOLD,
+    SPECULATIVE_GENERATION,
+    QUOTATION_CACHE_SIZE,
+    QUOTATION_FRESH_TTL_SECONDS,
+    QUOTATION_STALE_TTL_SECONDS,
+    QUOTATION_MISS_TIMEOUT_SECONDS,
+    LLM_PREWARM,
+    LLM_PREWARM_CONNECTIONS,
+    ENABLE_QUOTATION_PRELOAD,
+    SHARED_STATE_DIR,
+    QUOTATION_SNAPSHOT_MAX_AGE_SECONDS,
+    QUOTATION_SNAPSHOT_POLL_SECONDS,
+    STARTUP_WARMUP,
+    READY_REQUIRES_WARM,
+    ENABLE_OPENING_TURN,
+)
+from core.lazy import lazy, readiness, warm_up
+from core.metrics import (
+    timed_node,
+    record_usage,
+    render_prometheus,
+    metrics_snapshot,
+    PROMETHEUS_CONTENT_TYPE,
+    TURN_LATENCY,
+    NODE_LATENCY,
+    LLM_LATENCY,
+    LLM_TTFT,
+    TURNS,
+    OPENING_TURNS,
+)
+from core.llm_clients import get_llm, aprewarm
+from core.context_window import ContextWindow
+from core.contract import parse_contract, bind_contract
+from core.prompt_builder import PromptBuilder
+from core.opening_turn import OpeningTurn
+from core.session_store import SessionStore
+from core.tracing import begin_trace, span, traced, trace_async_stream
+from core.shared_snapshot import SharedSnapshot
+from core.streaming import ContractStreamParser, sse_event
+from core.summary_jobs import SummaryJobQueue
 
 # =========================
-# Azure OpenAI Configuration 
+# LLM Clients (shared pool, see core/llm_clients.py)
 # =========================
-llm = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_DEPLOYMENT_NAME"),
-    openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    max_tokens=90
+# Built on first use or by the startup warm-up, see core/lazy.py
+llm = lazy("llm.chat", lambda: bind_contract(get_llm("chat")))
+llm_summary = lazy("llm.summary", lambda: get_llm("summary"))
+
+# Preloaded quotation, computed once per host and shared by every
+# worker process so they all serve the same version.
+quotation_snapshot = SharedSnapshot(
+    os.path.join(SHARED_STATE_DIR, "insurance_quotation.json")
 )
 
-llm_summary = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_DEPLOYMENT_NAME"),
-    openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    max_tokens=512
+
+def shared_quotation() -> dict:
+    """Current {"version", "written_at", "data"} snapshot entry, or {}."""
+    if not ENABLE_QUOTATION_PRELOAD:
+        return {}
+    try:
+        return quotation_snapshot.read() or {}
+    except Exception as e:
+        print("❌ Quotation snapshot read failed:", str(e))
+        return {}
+
+# Per-vehicle quotes; the shared preload above is the fallback
+# when the caller's registration number is unknown.
+quotation_cache = QuotationCache(
+    max_entries=QUOTATION_CACHE_SIZE,
+    fresh_ttl=QUOTATION_FRESH_TTL_SECONDS,
+    stale_ttl=QUOTATION_STALE_TTL_SECONDS
 )
 
-start_quotation_loader(AGENT_SHARED_STATE)
-AGENT_SHARED_STATE = {
-    "quotation_summary": None
-}
+# =========================
+# System Prompt
+# =========================
+# Compiled once: the static prefix is byte-identical for every
+# call; name, time of day and quotation go in a trailing message.
+prompt_builder = PromptBuilder(
+    SYSTEM_PROMPT,
+    placeholders=("{{QUOTATION_SUMMARY}}", "{{USER_PROPERTIES}}")
+)
+
+# Scripted greeting served without the LLM when the call opens with "Hello?"
+opening_turn = OpeningTurn(OPENING_TEMPLATES)
+
+# =========================
+# Rolling Context Window
+# =========================
+context_window = ContextWindow(
+    llm_summary,
+    keep_turns=CONTEXT_KEEP_TURNS,
+    fold_batch_turns=CONTEXT_FOLD_BATCH_TURNS
+)
+
+# =========================
+# Session Store
+# =========================
+sessions = SessionStore(
+    max_sessions=SESSION_MAX_ENTRIES,
+    idle_ttl=SESSION_IDLE_TTL_SECONDS
+)
 
 # =========================
 # FastAPI App
@@ -51,29 +139,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("startup")
+async def start_background_warmup():
+    # Nothing here blocks startup; the worker accepts traffic meanwhile
+    # and anything still cold is built by the first request that needs it.
+    if ENABLE_QUOTATION_PRELOAD:
+        start_quotation_loader(
+            quotation_snapshot,
+            max_age=QUOTATION_SNAPSHOT_MAX_AGE_SECONDS,
+            poll_interval=QUOTATION_SNAPSHOT_POLL_SECONDS
+        )
+
+    async def _warm():
+        if STARTUP_WARMUP:
+            await asyncio.to_thread(warm_up)
+        if LLM_PREWARM:
+            await aprewarm(LLM_PREWARM_CONNECTIONS)
+
+    app.state.warmup_task = asyncio.create_task(_warm())
+
+
+@app.get("/ready")
+async def get_ready():
+    components = readiness()
+    warm = all(component["ready"] for component in components.values())
+    body = {
+        "ready": warm or not READY_REQUIRES_WARM,
+        "warm": warm,
+        "components": components,
+        "quotation_version": shared_quotation().get("version"),
+        "quotation_leader": quotation_snapshot.is_leader,
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
 # =========================
 # LangGraph State
 # =========================
 class State(TypedDict):
+    session_id: str
     conversation: list
     call_status: str
     language: str
     summary: str
+    summary_job_id: str
+    retrieve: bool
+    retrieved_info: str
+    answer_cache_key: dict
+    prefetched: bool
+    prefetched_response: str
 
 
 # =========================
 # Helpers
 # =========================
-def get_system_message(name: str):
-    hour = datetime.now().hour
+def get_system_messages(name: str, quotation_summary: str = None) -> list:
+    quotation_summary = quotation_summary or shared_quotation().get("data")
 
     quotation_block = ""
-    if AGENT_SHARED_STATE.get("quotation_summary"):
+    if quotation_summary:
         quotation_block = f"""
-
 ### QUOTATION DATA (CRITICAL — READ THIS FIRST)
 
-{AGENT_SHARED_STATE["quotation_summary"]}
+{quotation_summary}
 
 IMPORTANT OVERRIDE RULE:
 If any insurer-specific data (premium, IDV, add-ons)
@@ -81,40 +209,86 @@ is present above, it MUST be treated as the single
 source of truth and override all other knowledge.
 """
 
-    return SystemMessage(
-        content=(
-            SYSTEM_PROMPT.replace("Name", name)
-            .replace("{current_hour}", str(hour))
-            + quotation_block
-        )
-    )
-
-
-
-def llm_call(state: State):
+    return prompt_builder.messages(name, quotation_block)
+
+
+def opening_state(conversation: list, name: str, user_message: str) -> dict:
+    """
+    State update serving the pre-rendered greeting through the
+    prefetched-response path (no retrieval, no LLM call), or {}.
+    """
+    if not ENABLE_OPENING_TURN:
+        return {}
+    reply = opening_turn.reply(conversation, name, user_message)
+    if reply is None:
+        return {}
+    OPENING_TURNS.inc()
+    return {"prefetched": True, "prefetched_response": reply}
+
+
+def build_llm_messages(state: State) -> list:
+    """
+    Messages sent to the model for this turn. Retrieved knowledge
+    goes just before the latest user message and is not persisted
+    in the conversation.
+    """
+    messages = context_window.build(state["session_id"], state["conversation"])
+
+    retrieved_info = state.get("retrieved_info")
+    if retrieved_info:
+        messages = messages[:-1] + [
+            SystemMessage(content=f"### RETRIEVED KNOWLEDGE\n\n{retrieved_info}"),
+            messages[-1]
+        ]
+
+    return messages
+
+
+async def generate_reply(state: State) -> str:
+    with span("llm.invoke", role="chat") as current, LLM_LATENCY.time(mode="invoke"):
+        response = await llm.ainvoke(build_llm_messages(state))
+        if current is not None:
+            current.set(**(getattr(response, "usage_metadata", None) or {}))
+    record_usage(response)
+    return response.content
+
+
+async def stream_reply(state: State):
+    if state.get("prefetched_response") is not None:
+        yield state["prefetched_response"]
+        return
+
+    with span("llm.stream", role="chat") as current:
+        start = time.perf_counter()
+        first = True
+        async for chunk in llm.astream(build_llm_messages(state)):
+            if first:
+                LLM_TTFT.observe(time.perf_counter() - start)
+                if current is not None:
+                    current.set(ttft_ms=round((time.perf_counter() - start) * 1000, 1))
+                first = False
+            # With stream_usage the last chunk carries the token counts
+            record_usage(chunk)
+            if current is not None and getattr(chunk, "usage_metadata", None):
+                current.set(**chunk.usage_metadata)
+            yield chunk.content
+        LLM_LATENCY.observe(time.perf_counter() - start, mode="stream")
+
+
+@timed_node("llm_call")
+@traced("node.llm_call")
+async def llm_call(state: State):
     conversation = state["conversation"]
 
-    start_time = time.time()
-    response = llm.invoke(conversation)
-    print(f"LLM latency: {time.time() - start_time:.2f}s")
+    content = state.get("prefetched_response")
+    if content is None:
+        start = time.perf_counter()
+        content = await generate_reply(state)
+        remember_answer(state, content, time.perf_counter() - start)
 
-    conversation.append(AIMessage(content=response.content))
+    conversation.append(AIMessage(content=content))
 
-    match = re.search(
-        r'\{.*"call_status"\s*:\s*"(END|ONGOING)".*("language"\s*:\s*"[^"]+")?.*\}',
-        response.content
-    )
-
-    call_status = "ONGOING"
-    language = None
-
-    if match:
-        try:
-            payload = json.loads(match.group())
-            call_status = payload.get("call_status", "ONGOING")
-            language = payload.get("language")
-        except Exception:
-            pass
+    _, call_status, language = parse_contract(content)
 
     return {
         "conversation": conversation,
@@ -123,9 +297,11 @@ def llm_call(state: State):
     }
 
 
-def summarize_conversation(state: State):
-    conversation = state["conversation"]
-
+def summarize_transcript(conversation: list) -> str:
+    """
+    Runs on a summary worker thread, off the request path.
+    Returns the post-call summary as a JSON string.
+    """
     summary_prompt = ("""
 You are an assistant that summarizes insurance call conversations for reporting.
 Summarize the call by extracting these fields as top-level JSON keys (set to null if not found):
@@ -166,28 +342,71 @@ Return ONLY a valid JSON object with these fields as top-level keys, no explanat
     summary_text = re.sub(r"^```json\s*|\s*```$", "", summary_text)
 
     match = re.search(r"\{[\s\S]*\}", summary_text)
-    summary_out = match.group() if match else "{}"
+    return match.group() if match else "{}"
+
+
+@timed_node("summarize_conversation")
+@traced("node.summarize_conversation")
+async def summarize_conversation(state: State):
+    """
+    Hands the finished call to the background summary pool.
+    The summary is fetched later via GET /summary/{session_id}
+    or delivered to SUMMARY_WEBHOOK_URL.
+    """
+    job_id = summary_jobs.submit(state["session_id"], state["conversation"])
 
     return {
-        "conversation": conversation,
+        "conversation": state["conversation"],
         "call_status": "END",
-        "summary": summary_out
+        "summary": None,
+        "summary_job_id": job_id
     }
 
 
+# =========================
+# Post-call Summary Queue
+# =========================
+summary_jobs = SummaryJobQueue(
+    summarize_transcript,
+    workers=SUMMARY_WORKERS,
+    max_pending=SUMMARY_QUEUE_SIZE,
+    max_results=SUMMARY_RESULT_RETENTION,
+    webhook_url=SUMMARY_WEBHOOK_URL
+)
+
+
 # =========================
 # LangGraph Workflow
 # =========================
 workflow = StateGraph(State)
 
+workflow.add_node("route_retrieval", route_retrieval)
+workflow.add_node("answer_cache", answer_cache_node)
+workflow.add_node("rag_node", rag_node)
 workflow.add_node("llm_call", llm_call)
 workflow.add_node("summarize_conversation", summarize_conversation)
 
-workflow.add_node("rag_node", rag_node)
-workflow.add_edge("rag_node", "llm_call_postrag")
-
+workflow.set_entry_point("route_retrieval")
 
-workflow.set_entry_point("llm_call")
+# Trivial turns (acks, names, dates, reg. numbers) skip retrieval
+workflow.add_conditional_edges(
+    "route_retrieval",
+    lambda s: "answer_cache" if s["retrieve"] else "llm_call",
+    {
+        "answer_cache": "answer_cache",
+        "llm_call": "llm_call"
+    }
+)
+# Knowledge questions answered before skip retrieval and generation
+workflow.add_conditional_edges(
+    "answer_cache",
+    lambda s: "llm_call" if s.get("prefetched_response") is not None else "rag_node",
+    {
+        "rag_node": "rag_node",
+        "llm_call": "llm_call"
+    }
+)
+workflow.add_edge("rag_node", "llm_call")
 
 workflow.add_conditional_edges(
     "llm_call",
@@ -202,12 +421,135 @@ workflow.add_edge("summarize_conversation", END)
 
 graph_app = workflow.compile()
 
+
+# =========================
+# Speculative Prefetch (ASR partials)
+# =========================
+async def prefetch_retrieval(state: State) -> dict:
+    update = await route_retrieval(state)
+    if update["retrieve"]:
+        update.update(await rag_node(state))
+    return update
+
+
+prefetcher = SpeculativePrefetcher(
+    prefetch_retrieval,
+    generate=generate_reply if SPECULATIVE_GENERATION else None,
+    threshold=SPECULATIVE_MATCH_THRESHOLD
+)
+
+# =========================
+# Streaming turn
+# =========================
+async def stream_chat(session, session_id: str, user_name: str, user_message: str, client_call_status: str):
+    """
+    Runs one turn with token streaming and yields SSE events:
+    sentence-sized `chunk` events as soon as they are complete,
+    then a single `done` event carrying the call_status contract.
+    """
+    turn_start_time = time.perf_counter()
+    async with session.async_lock:
+        conversation = session.conversation
+        turn_start = len(conversation)
+        conversation.append(HumanMessage(content=user_message))
+
+        state = {
+            "session_id": session_id,
+            "conversation": conversation,
+            "call_status": client_call_status,
+            "language": None,
+            "summary": None,
+            "summary_job_id": None,
+            "retrieve": False,
+            "retrieved_info": "",
+            "prefetched": False,
+            "prefetched_response": None,
+            "answer_cache_key": None
+        }
+
+        try:
+            if client_call_status == "END":
+                result = await summarize_conversation(state)
+            else:
+                parser = ContractStreamParser()
+
+                state.update(await prefetcher.claim(session_id, user_message))
+                state.update(opening_state(conversation, user_name, user_message))
+                state.update(await route_retrieval(state))
+                if state["retrieve"]:
+                    state.update(await answer_cache_node(state))
+                    if state.get("prefetched_response") is None:
+                        state.update(await rag_node(state))
+
+                llm_start = time.perf_counter()
+                with NODE_LATENCY.time(node="llm_call"):
+                    async for token in stream_reply(state):
+                        for sentence in parser.feed(token):
+                            yield sse_event({"type": "chunk", "text": sentence})
+                    for sentence in parser.finish():
+                        yield sse_event({"type": "chunk", "text": sentence})
+                if state.get("prefetched_response") is None:
+                    remember_answer(state, parser.text, time.perf_counter() - llm_start)
+
+                conversation.append(AIMessage(content=parser.text))
+                state["call_status"] = parser.call_status
+                state["language"] = parser.language
+
+                result = state
+                if parser.call_status == "END":
+                    result = await summarize_conversation(state)
+                    result["language"] = parser.language
+        except BaseException:
+            # Also covers the client hanging up mid-stream
+            del conversation[turn_start:]
+            raise
+
+        session.call_status = result.get("call_status")
+        session.language = result.get("language") or session.language
+
+    if session.call_status == "END":
+        sessions.discard(session_id)
+        context_window.discard(session_id)
+        prefetcher.discard(session_id)
+
+    TURN_LATENCY.observe(time.perf_counter() - turn_start_time, mode="stream")
+    TURNS.inc(call_status=session.call_status)
+
+    yield sse_event({
+        "type": "done",
+        "session_id": session_id,
+        "call_status": result.get("call_status"),
+        "language": result.get("language"),
+        "summary": result.get("summary"),
+        "summary_job_id": result.get("summary_job_id")
+    })
+
+
 # =========================
 # API Endpoint
 # =========================
 @app.post("/chat")
 async def chat(request: Request):
-    data = await request.json()
+    # Trace context comes from the telephony side's traceparent /
+    # X-Trace-Id header and is echoed back on the response
+    trace = begin_trace("chat", request.headers, agent="insurance")
+    try:
+        with trace.activate():
+            response = await handle_chat(request, trace)
+    except BaseException as e:
+        trace.finish(e)
+        raise
+
+    response.headers.update(trace.response_headers())
+    if not isinstance(response, StreamingResponse):
+        # Streamed turns finish their trace when the stream ends
+        trace.finish(status_code=response.status_code)
+    return response
+
+
+async def handle_chat(request: Request, trace):
+    with span("request.parse"):
+        data = await request.json()
 
     user_id = data.get("user_id")
     user_name = data.get("name", "Customer")
@@ -221,41 +563,211 @@ async def chat(request: Request):
         )
 
     session_id = data.get("session_id") or str(uuid4())
-    conversation = data.get("conversation")
-
-    if not conversation:
-        conversation = [get_system_message(user_name)]
+    trace.set(session_id=session_id, stream=bool(data.get("stream")))
+
+    # The quote is only needed to build a new session's prompt.
+    # Served from cache (stale-while-revalidate) once known.
+    quotation_summary = None
+    registration_number = data.get("registration_number")
+    if registration_number and sessions.get(session_id) is None:
+        quotation_summary = await quotation_cache.aget(
+            registration_number,
+            timeout=QUOTATION_MISS_TIMEOUT_SECONDS
+        )
 
-    conversation.append(HumanMessage(content=user_message))
+    # Conversation lives server-side; a client-supplied conversation
+    # is only used to seed a session the store has never seen.
+    session = sessions.get_or_create(
+        session_id,
+        lambda: data.get("conversation") or get_system_messages(user_name, quotation_summary)
+    )
 
-    state = {
-        "conversation": conversation,
-        "call_status": client_call_status,
-        "language": None,
-        "summary": ""
-    }
+    if data.get("stream"):
+        return StreamingResponse(
+            trace_async_stream(
+                trace,
+                stream_chat(session, session_id, user_name, user_message, client_call_status)
+            ),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
 
-    if client_call_status == "END":
-        result = summarize_conversation(state)
-    else:
-        result = graph_app.invoke(state)
+    turn_start_time = time.perf_counter()
+    async with session.async_lock:
+        conversation = session.conversation
+        turn_start = len(conversation)
+        conversation.append(HumanMessage(content=user_message))
+
+        state = {
+            "session_id": session_id,
+            "conversation": conversation,
+            "call_status": client_call_status,
+            "language": None,
+            "summary": None,
+            "summary_job_id": None,
+            "retrieve": False,
+            "retrieved_info": "",
+            "prefetched": False,
+            "prefetched_response": None,
+            "answer_cache_key": None
+        }
 
+        try:
+            if client_call_status == "END":
+                result = await summarize_conversation(state)
+            else:
+                state.update(await prefetcher.claim(session_id, user_message))
+                state.update(opening_state(conversation, user_name, user_message))
+                result = await graph_app.ainvoke(state)
+        except BaseException:
+            # Roll back the partial turn so a retry does not duplicate it
+            del conversation[turn_start:]
+            raise
+
+        session.call_status = result.get("call_status")
+        session.language = result.get("language") or session.language
+
+    if session.call_status == "END":
+        sessions.discard(session_id)
+        context_window.discard(session_id)
+        prefetcher.discard(session_id)
+
+    TURN_LATENCY.observe(time.perf_counter() - turn_start_time, mode="json")
+    TURNS.inc(call_status=session.call_status)
+
+    # Only this turn's reply is returned, never the history
     last_agent_msg = next(
-        (m for m in reversed(result["conversation"]) if isinstance(m, AIMessage)),
+        (
+            m for m in reversed(result["conversation"][turn_start:])
+            if isinstance(m, AIMessage)
+        ),
         None
     )
 
-    agent_text = last_agent_msg.content if last_agent_msg else ""
-    agent_text = re.sub(
-        r'\{.*"call_status".*\}$',
-        '',
-        agent_text
-    ).strip()
+    agent_text, _, _ = parse_contract(last_agent_msg.content if last_agent_msg else "")
+
+    trace.set(call_status=result.get("call_status"))
+    with span("response.serialize"):
+        return JSONResponse({
+            "session_id": session_id,
+            "agent": agent_text,
+            "call_status": result.get("call_status"),
+            "language": result.get("language"),
+            "summary": result.get("summary"),
+            "summary_job_id": result.get("summary_job_id")
+        })
+
+
+@app.post("/partial")
+async def partial(request: Request):
+    """
+    Speculative prefetch on an ASR partial transcript. Starts
+    retrieval now (and generation, if enabled, on stable partials);
+    the final /chat reuses it when the transcript matches.
+    """
+    data = await request.json()
+
+    session_id = data.get("session_id")
+    partial_text = data.get("message")
+
+    if not session_id or not partial_text:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Missing session_id or message"}
+        )
+
+    session = sessions.get(session_id)
+    if session is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Unknown session"}
+        )
+
+    speculation = prefetcher.submit(
+        session_id,
+        session.conversation,
+        partial_text,
+        # Never generate against a conversation mid-turn
+        stable=bool(data.get("stable")) and not session.async_lock.locked()
+    )
 
     return {
         "session_id": session_id,
-        "agent": agent_text,
-        "call_status": result.get("call_status"),
-        "language": result.get("language"),
-        "summary": result.get("summary")
+        "status": "prefetching",
+        "generating": speculation.generation is not None
     }
+
+
+@app.post("/quotation/prefetch")
+async def quotation_prefetch(request: Request):
+    # Lets the dialer warm the cache before the call connects
+    data = await request.json()
+
+    registration_number = data.get("registration_number")
+    if not registration_number:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Missing registration_number"}
+        )
+
+    quotation_cache.refresh(registration_number)
+    return {"registration_number": registration_number, "status": "refreshing"}
+
+
+@app.get("/summary/{session_id}")
+async def get_summary(session_id: str):
+    job = summary_jobs.get(session_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No summary job for session"}
+        )
+
+    return job
+
+
+@app.get("/rag/cache")
+async def get_retrieval_cache_stats():
+    return {**retrieval_cache_stats(), "answers": answer_cache.stats()}
+
+
+@app.get("/rag/router")
+async def get_router_stats():
+    return router_stats()
+
+
+@app.get("/rag/speculation")
+async def get_speculation_stats():
+    # Speculative prefetches started on /partial and reused by /chat
+    return prefetcher.stats_snapshot()
+
+
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    # Prometheus text format; ?format=json adds p50/p90/p99 estimates
+    if request.query_params.get("format") == "json":
+        return metrics_snapshot()
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    # Per-endpoint hedging / failover counters and cassette hits/misses
+    # (empty with one endpoint and no cassette)
+    return {
+        role: client.stats()
+        for role, client in (("chat", llm), ("summary", llm_summary))
+        if client.ready and hasattr(client.get(), "stats")
+    }
+
+
+@app.post("/rag/cache/invalidate")
+async def post_retrieval_cache_invalidate():
+    # Called by the ingestion job once the collection is re-indexed.
+    # Bumps the host-wide index version, so every worker's document
+    # cache is invalidated, not only this one's. Cached answers were
+    # generated from the old documents too
+    version = invalidate_retrieval_cache()
+    answer_cache.clear()
+    return {"status": "invalidated", "index_version": version}
@@ -0,0 +1,292 @@
+"""
+Batched, incremental ingestion for the insurance_docs collection.
+
+Usage (from the repository root):
+
+    QDRANT_URL=... python -m domains.insurance_agent.ingest docs/policies \\
+        --invalidate-url http://localhost:8000/rag/cache/invalidate
+
+Chunks are identified by a hash of their content, so re-running after a
+small document change only embeds and upserts the chunks that changed
+and deletes the ones that disappeared. The collection mirrors `root`:
+chunks of files that were deleted or renamed are deleted too, so point
+each collection at exactly one document directory.
+"""
+import os
+import time
+import uuid
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+COLLECTION_NAME = os.getenv("VECTOR_COLLECTION_NAME", "insurance_docs")
+EMBEDDING_MODEL_NAME = os.getenv(
+    "EMBEDDING_MODEL_NAME",
+    "sentence-transformers/all-MiniLM-L6-v2"
+)
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+
+# Stable namespace so a chunk's point id is a pure function of its content
+CHUNK_NAMESPACE = uuid.UUID("6f1c1d2e-8a4b-4c55-9a53-3b1f1f2e7c10")
+
+
+# =========================
+# Chunking (process pool)
+# =========================
+def read_pages(path: str) -> list:
+    """Returns [(page_number, text)] for a PDF or text file."""
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        return [(i, page.extract_text() or "") for i, page in enumerate(reader.pages, start=1)]
+
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return [(1, f.read())]
+
+
+def chunk_file(args) -> list:
+    path, root, chunk_size, chunk_overlap = args
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    source = os.path.relpath(path, root)
+
+    chunks = []
+    for page, text in read_pages(path):
+        for piece in splitter.split_text(text):
+            piece = piece.strip()
+            if not piece:
+                continue
+
+            content_hash = hashlib.sha256(
+                f"{source}\x00{page}\x00{piece}".encode("utf-8")
+            ).hexdigest()
+
+            chunks.append({
+                "id": str(uuid.uuid5(CHUNK_NAMESPACE, content_hash)),
+                "page_content": piece,
+                "metadata": {
+                    "source": source,
+                    "page": page,
+                    "content_hash": content_hash,
+                },
+            })
+
+    return chunks
+
+
+def discover(root: str) -> list:
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+# =========================
+# Qdrant helpers
+# =========================
+def existing_ids(client, collection: str, ids: list, batch_size: int) -> set:
+    found = set()
+    for i in range(0, len(ids), batch_size):
+        points = client.retrieve(
+            collection_name=collection,
+            ids=ids[i:i + batch_size],
+            with_payload=False,
+            with_vectors=False
+        )
+        found.update(str(p.id) for p in points)
+    return found
+
+
+def stale_ids(client, collection: str, keep: set, batch_size: int) -> list:
+    """Every point in the collection that the current run no longer produces."""
+    stale = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False
+        )
+        stale.extend(str(p.id) for p in points if str(p.id) not in keep)
+        if offset is None:
+            break
+    return stale
+
+
+def ensure_collection(client, collection: str, dim: int):
+    from qdrant_client import models
+
+    if not client.collection_exists(collection):
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+        )
+        print(f"✅ Created collection '{collection}' ({dim} dims)")
+
+
+# =========================
+# Pipeline
+# =========================
+def ingest(
+    root: str,
+    collection: str = COLLECTION_NAME,
+    chunk_size: int = 800,
+    chunk_overlap: int = 100,
+    embed_batch_size: int = 256,
+    upsert_batch_size: int = 512,
+    workers: int = None,
+    full: bool = False,
+) -> dict:
+    from qdrant_client import QdrantClient, models
+    from langchain.embeddings import HuggingFaceEmbeddings
+
+    stats = {}
+
+    # 1️⃣ Chunk every file in parallel
+    start = time.perf_counter()
+    paths = discover(root)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        per_file = pool.map(
+            chunk_file,
+            [(path, root, chunk_size, chunk_overlap) for path in paths]
+        )
+        chunks = [chunk for file_chunks in per_file for chunk in file_chunks]
+
+    # Identical chunks (e.g. repeated boilerplate on one page) collapse
+    chunks = list({chunk["id"]: chunk for chunk in chunks}.values())
+
+    elapsed = time.perf_counter() - start
+    stats["files"] = len(paths)
+    stats["chunks"] = len(chunks)
+    stats["chunks_per_s"] = round(len(chunks) / elapsed, 1) if elapsed else 0.0
+    print(f">>> [Ingest] {len(chunks)} chunks from {len(paths)} files in {elapsed:.2f}s")
+
+    client = QdrantClient(
+        url=os.getenv("QDRANT_URL"),
+        api_key=os.getenv("QDRANT_API_KEY")
+    )
+    collection_exists = client.collection_exists(collection)
+
+    # 2️⃣ Skip chunks whose content hash is already indexed
+    all_ids = [chunk["id"] for chunk in chunks]
+    present = set()
+    if collection_exists and not full:
+        present = existing_ids(client, collection, all_ids, upsert_batch_size)
+
+    pending = [chunk for chunk in chunks if chunk["id"] not in present]
+    stats["unchanged"] = len(chunks) - len(pending)
+    print(f">>> [Ingest] {stats['unchanged']} unchanged, {len(pending)} to embed")
+
+    # 3️⃣ Embed in large batches
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME,
+        encode_kwargs={"batch_size": embed_batch_size, "normalize_embeddings": True}
+    )
+
+    start = time.perf_counter()
+    vectors = []
+    for i in range(0, len(pending), embed_batch_size):
+        batch = pending[i:i + embed_batch_size]
+        vectors.extend(embeddings.embed_documents([c["page_content"] for c in batch]))
+
+    elapsed = time.perf_counter() - start
+    stats["embedded"] = len(vectors)
+    stats["embeddings_per_s"] = round(len(vectors) / elapsed, 1) if elapsed else 0.0
+    if vectors:
+        print(f">>> [Ingest] Embedded {len(vectors)} chunks at {stats['embeddings_per_s']}/s")
+
+    # 4️⃣ Bulk upsert, then drop chunks that no longer exist
+    start = time.perf_counter()
+    if vectors:
+        ensure_collection(client, collection, len(vectors[0]))
+
+    for i in range(0, len(pending), upsert_batch_size):
+        client.upsert(
+            collection_name=collection,
+            points=[
+                models.PointStruct(
+                    id=chunk["id"],
+                    vector=vector,
+                    payload={
+                        "page_content": chunk["page_content"],
+                        "metadata": chunk["metadata"],
+                    }
+                )
+                for chunk, vector in zip(
+                    pending[i:i + upsert_batch_size],
+                    vectors[i:i + upsert_batch_size]
+                )
+            ],
+            wait=True
+        )
+
+    stale = []
+    if collection_exists and not chunks:
+        # Most likely a wrong path; never empty the collection over it
+        print(f"❌ No chunks under {root}, not pruning '{collection}'")
+    elif collection_exists:
+        # Includes chunks of files deleted or renamed since the last run
+        stale = stale_ids(client, collection, set(all_ids), upsert_batch_size)
+        if stale:
+            client.delete(
+                collection_name=collection,
+                points_selector=models.PointIdsList(points=stale)
+            )
+
+    elapsed = time.perf_counter() - start
+    stats["upserted"] = len(pending)
+    stats["deleted"] = len(stale)
+    stats["upsert_per_s"] = round(len(pending) / elapsed, 1) if elapsed and pending else 0.0
+    print(f">>> [Ingest] Upserted {len(pending)}, deleted {len(stale)} stale in {elapsed:.2f}s")
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Incrementally index policy documents into Qdrant"
+    )
+    parser.add_argument("root", help="Directory of PDF / text documents")
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--embed-batch-size", type=int, default=256)
+    parser.add_argument("--upsert-batch-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--full", action="store_true", help="Re-embed every chunk")
+    parser.add_argument(
+        "--invalidate-url",
+        help="Agent endpoint to call after indexing, e.g. .../rag/cache/invalidate"
+    )
+    args = parser.parse_args()
+
+    stats = ingest(
+        args.root,
+        collection=args.collection,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        embed_batch_size=args.embed_batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        workers=args.workers,
+        full=args.full,
+    )
+    print("✅ Ingestion complete:", stats)
+
+    if args.invalidate_url and (stats["upserted"] or stats["deleted"]):
+        try:
+            requests.post(args.invalidate_url, timeout=5)
+            print("✅ Retrieval cache invalidated")
+        except Exception as e:
+            print("❌ Retrieval cache invalidation failed:", str(e))
@@ -1,4 +1,4 @@
-system_prompt = """
+SYSTEM_PROMPT = """
 ### **Role & Personality**
 
 * You are **Arjun**, a friendly, empathetic, and knowledgeable **voice assistant for Nova Insure**.
@@ -245,3 +245,29 @@ Note: Ensure the Agent's response is non-repetitive, context-aware, and advances
 At the end of every response, output a JSON object on a new line with the following format:
 {"call_status": "END" or "ONGOING", "RAG_needed": "Yes" or "No", "language": Language of Agent's response}
 """
+
+
+# Pre-rendered first reply (core/opening_turn.py), following the
+# Introduction step above. Arjun speaks only English.
+OPENING_TEMPLATES = {
+    "English": {
+        "named": (
+            "{salutation} {name}, this is Arjun from Nova Insure. "
+            "I'm calling to assist you with your bike insurance needs. "
+            "This call is being recorded for training and quality purposes. "
+            "How can I help you today?"
+        ),
+        "anonymous": (
+            "{salutation}, this is Arjun from Nova Insure. "
+            "I'm calling to assist you with your bike insurance needs. "
+            "This call is being recorded for training and quality purposes. "
+            "How can I help you today?"
+        ),
+        "salutations": {
+            "morning": "Good morning",
+            "afternoon": "Good afternoon",
+            "evening": "Good evening",
+            "night": "Hello",
+        },
+    },
+}
@@ -1,28 +1,29 @@
 import time
+import random
+import asyncio
 import threading
 import requests
 import json
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from langchain_core.messages import HumanMessage
-from langchain_openai import AzureChatOpenAI
-import os
+
+from config.settings import QUOTATION_INSURERS, QUOTATION_DEADLINE_SECONDS
+from core.lazy import lazy
+from core.llm_clients import get_llm
 
 # =========================
 # LLM for quotation summarization
 # =========================
 
-llm_quote_summary = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_DEPLOYMENT_NAME"),
-    openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    max_tokens=400
-)
+llm_quote_summary = lazy("llm.quote_summary", lambda: get_llm("quote_summary"))
 
 # =========================
 # Dummy quotation API
 # =========================
 
-def fetch_dummy_quotation():
+def fetch_dummy_quotation(registration_number: str = None):
     """
     Simulates an external quotation API.
     This replaces real insurer integrations.
@@ -30,6 +31,7 @@ def fetch_dummy_quotation():
     time.sleep(1)  # simulate network delay
 
     return {
+        "registration_number": registration_number,
         "insurer": "InsurerA",
         "premium": 12456,
         "idv": "₹4.2L – ₹4.5L",
@@ -38,15 +40,191 @@ def fetch_dummy_quotation():
     }
 
 
+# =========================
+# Multi-insurer fan-out
+# =========================
+
+class StubInsurerAdapter:
+    """
+    Local stand-in for one insurer's quotation API,
+    with configurable latency and jitter for testing.
+    """
+
+    def __init__(self, insurer: str, latency: float = 1.0, jitter: float = 0.0):
+        self.insurer = insurer
+        self.latency = latency
+        self.jitter = jitter
+
+    def fetch(self, registration_number: str = None) -> dict:
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        # Deterministic per-insurer figures so runs are comparable
+        seed = zlib.crc32(self.insurer.encode("utf-8"))
+        return {
+            "insurer": self.insurer,
+            "premium": 11000 + seed % 3000,
+            "idv": "₹4.2L – ₹4.5L",
+            "add_ons": ["Zero Dep", "Engine Protect"][: 1 + seed % 2],
+            "cashless_garages": 2500 + seed % 1500
+        }
+
+
+def parse_insurer_adapters(spec: str) -> list:
+    """
+    Builds stub adapters from "Name:latency[:jitter],..."
+    e.g. "Atlas:0.4,Unity:0.9:0.2,Horizon:2.5".
+    """
+    adapters = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, *timing = item.split(":")
+        adapters.append(StubInsurerAdapter(name, *(float(t) for t in timing)))
+    return adapters
+
+
+class QuotationAggregator:
+    """
+    Fans a quotation request out to every insurer adapter
+    concurrently and returns whatever completed before the
+    overall deadline. Late or failed insurers are listed as
+    unavailable instead of holding up the result.
+    """
+
+    def __init__(self, adapters: list, deadline: float = 1.5):
+        self.adapters = adapters
+        self.deadline = deadline
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(4, 4 * len(adapters)),
+            thread_name_prefix="insurer"
+        )
+
+    def fetch(self, registration_number: str = None) -> dict:
+        futures = {
+            self._pool.submit(adapter.fetch, registration_number): adapter.insurer
+            for adapter in self.adapters
+        }
+        done, not_done = wait(futures, timeout=self.deadline)
+
+        quotes = []
+        unavailable = []
+        for future, insurer in futures.items():
+            if future in done and future.exception() is None:
+                quotes.append(future.result())
+            else:
+                unavailable.append(insurer)
+                future.cancel()
+
+        if unavailable:
+            print(f"⚠️ Quotation deadline/failures, missing: {', '.join(unavailable)}")
+
+        return {
+            "registration_number": registration_number,
+            "quotes": sorted(quotes, key=lambda q: q.get("premium", float("inf"))),
+            "unavailable": unavailable
+        }
+
+
+quotation_aggregator = None
+if QUOTATION_INSURERS:
+    quotation_aggregator = QuotationAggregator(
+        parse_insurer_adapters(QUOTATION_INSURERS),
+        deadline=QUOTATION_DEADLINE_SECONDS
+    )
+
+
+def fetch_quotation(registration_number: str = None) -> dict:
+    if quotation_aggregator is not None:
+        return quotation_aggregator.fetch(registration_number)
+    return fetch_dummy_quotation(registration_number)
+
+
 # =========================
 # Quotation summarization
 # =========================
 
+QUOTE_FIELDS = {
+    "insurer": str,
+    "premium": (int, float),
+    "idv": str,
+    "add_ons": list,
+    "cashless_garages": int,
+}
+
+
+def _format_amount(value) -> str:
+    return f"{value:,}" if isinstance(value, int) else f"{value:,.2f}"
+
+
+def _is_known_quote(quote) -> bool:
+    return (
+        isinstance(quote, dict)
+        and "insurer" in quote
+        and set(quote) <= set(QUOTE_FIELDS)
+        and all(isinstance(quote[k], QUOTE_FIELDS[k]) for k in quote)
+        and all(isinstance(a, str) for a in quote.get("add_ons", []))
+    )
+
+
+def _render_quote(quote: dict) -> list:
+    lines = [f"Insurer: {quote['insurer']}"]
+    if "premium" in quote:
+        lines.append(f"Premium: ₹{_format_amount(quote['premium'])}")
+    if "idv" in quote:
+        lines.append(f"IDV: {quote['idv']}")
+    if "add_ons" in quote:
+        lines.append(f"Add-ons: {', '.join(quote['add_ons']) or 'None'}")
+    if "cashless_garages" in quote:
+        lines.append(f"Cashless garages: {_format_amount(quote['cashless_garages'])}")
+    return lines
+
+
+def render_quotation(quotation_json: dict):
+    """
+    Deterministic rendering for the known quotation shapes:
+    a single insurer quote, or the aggregator's merged result.
+    Returns None for anything else.
+    """
+    if not isinstance(quotation_json, dict):
+        return None
+
+    quote = dict(quotation_json)
+    registration_number = quote.pop("registration_number", None)
+    header = f"Vehicle: {registration_number}" if registration_number else None
+
+    if _is_known_quote(quote):
+        return "\n".join(filter(None, [header] + _render_quote(quote)))
+
+    if set(quote) == {"quotes", "unavailable"}:
+        quotes, unavailable = quote["quotes"], quote["unavailable"]
+        if not all(_is_known_quote(q) for q in quotes):
+            return None
+
+        lines = [header] if header else []
+        lines.append(
+            f"Quotes from {len(quotes)} insurer(s), lowest premium first:"
+            if quotes else "No insurer quotes are available right now."
+        )
+        for idx, q in enumerate(quotes, start=1):
+            first, *rest = _render_quote(q)
+            lines.append(f"{idx}. {first}")
+            lines.extend(f"   {line}" for line in rest)
+        if unavailable:
+            lines.append(f"Not available right now: {', '.join(map(str, unavailable))}")
+        return "\n".join(lines)
+
+    return None
+
+
 def summarize_quotation(quotation_json: dict) -> str:
     """
     Converts raw quotation JSON into a compact,
     agent-consumable summary.
+    Known shapes are rendered by template; the LLM
+    is only a fallback for unknown ones.
     """
+    rendered = render_quotation(quotation_json)
+    if rendered is not None:
+        return rendered
+
     prompt = f"""
 You are given raw insurance quotation data.
 Summarize it into a short, factual, structured text.
@@ -71,24 +249,159 @@ Quotation JSON:
 # Background quotation loader
 # =========================
 
-def start_quotation_loader(shared_state: dict):
+def start_quotation_loader(snapshot, max_age: float = 0, poll_interval: float = 5.0):
     """
     Runs at app startup.
     Fetches quotation, summarizes it,
-    and stores it in shared_state.
+    and publishes it to the host-wide `snapshot` (core/shared_snapshot.py).
+
+    Only the leader worker fetches and summarizes, and only when the
+    snapshot is missing or older than `max_age` seconds (0 = never
+    refresh). Followers keep polling so one of them takes over if
+    the leader dies.
     """
 
     def _loader():
-        try:
-            raw_quote = fetch_dummy_quotation()
-            summary = summarize_quotation(raw_quote)
+        while True:
+            try:
+                entry = snapshot.read()
+                stale = entry is None or (
+                    max_age and time.time() - entry["written_at"] >= max_age
+                )
 
-            shared_state["quotation_summary"] = summary
-            print("✅ Quotation summary loaded into system state")
+                if stale and snapshot.try_lead():
+                    raw_quote = fetch_quotation()
+                    version = snapshot.write(summarize_quotation(raw_quote))
+                    print(f"✅ Quotation summary v{version} published to shared snapshot")
 
-        except Exception as e:
-            print("❌ Quotation loader failed:", str(e))
-            shared_state["quotation_summary"] = None
+            except Exception as e:
+                print("❌ Quotation loader failed:", str(e))
+
+            time.sleep(poll_interval)
 
     thread = threading.Thread(target=_loader, daemon=True)
     thread.start()
+
+
+# =========================
+# Per-vehicle quotation cache
+# =========================
+
+def load_quotation_summary(registration_number: str) -> str:
+    return summarize_quotation(fetch_quotation(registration_number))
+
+
+class QuotationCache:
+    """
+    Quotation summaries keyed by vehicle registration number.
+
+    Entries younger than `fresh_ttl` are served as-is. Entries up to
+    `stale_ttl` old are still served immediately while a background
+    refresh runs (stale-while-revalidate). Concurrent misses for the
+    same key share one in-flight fetch, and the cache is LRU-bounded.
+    """
+
+    def __init__(
+        self,
+        loader=load_quotation_summary,
+        max_entries: int = 1000,
+        fresh_ttl: float = 900,
+        stale_ttl: float = 86400,
+        workers: int = 4,
+    ):
+        self._loader = loader
+        self.max_entries = max_entries
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="quotation"
+        )
+        self.stats = Counter()
+
+    def get(self, key: str, timeout: float = None):
+        """
+        Returns the cached summary, waiting up to `timeout`
+        seconds on a miss. Returns None if nothing arrives in time.
+        """
+        value, future = self._lookup(key)
+        if future is None:
+            return value
+
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    async def aget(self, key: str, timeout: float = None):
+        value, future = self._lookup(key)
+        if future is None:
+            return value
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timeout
+            )
+        except Exception:
+            return None
+
+    def refresh(self, key: str):
+        """Starts a background refresh (coalesced with any in flight)."""
+        with self._lock:
+            return self._refresh_locked(key)
+
+    def _lookup(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                fetched_at, value = entry
+                age = time.monotonic() - fetched_at
+
+                if age <= self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age > self.fresh_ttl:
+                        self.stats["stale"] += 1
+                        self._refresh_locked(key)
+                    else:
+                        self.stats["fresh"] += 1
+                    return value, None
+
+                del self._entries[key]
+
+            self.stats["miss"] += 1
+            return None, self._refresh_locked(key)
+
+    def _refresh_locked(self, key: str):
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._pool.submit(self._load, key)
+            self._inflight[key] = future
+        else:
+            self.stats["coalesced"] += 1
+        return future
+
+    def _load(self, key: str):
+        try:
+            value = self._loader(key)
+        except Exception as e:
+            # Keep serving whatever (stale) entry we still have
+            print(f"❌ Quotation refresh failed for {key}:", str(e))
+            with self._lock:
+                self.stats["error"] += 1
+                self._inflight.pop(key, None)
+            raise
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+
+        print(f"✅ Quotation cached for {key}")
+        return value
@@ -1,32 +1,165 @@
 import os
-from langchain.vectorstores import Qdrant
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.schema import Document
+import re
+
+from config.settings import (
+    VECTOR_DB_TYPE,
+    LOCAL_VECTOR_SNAPSHOT_PATH,
+    LOCAL_VECTOR_MMAP,
+    RETRIEVAL_CACHE_SIZE,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+    SHARED_STATE_DIR,
+)
+from core.lazy import lazy
+from core.metrics import timed_node, RETRIEVALS, RETRIEVAL_CACHE
+from core.tracing import span, traced
+from core.shared_snapshot import SharedSnapshot
+from core.ttl_cache import TTLCache
 
 
 # Vector Store Setup 
 COLLECTION_NAME = os.getenv("VECTOR_COLLECTION_NAME", "insurance_docs")
+RETRIEVAL_TOP_K = 5
+
+
+# Both are built on first retrieval (or by the startup warm-up), not
+# at import: loading the sentence-transformers model takes seconds
+# and an unreachable Qdrant must not stop the worker from booting.
+def _build_embeddings():
+    from langchain.embeddings import HuggingFaceEmbeddings
 
-embeddings = HuggingFaceEmbeddings(
-    model_name=os.getenv(
-        "EMBEDDING_MODEL_NAME",
-        "sentence-transformers/all-MiniLM-L6-v2"
+    return HuggingFaceEmbeddings(
+        model_name=os.getenv(
+            "EMBEDDING_MODEL_NAME",
+            "sentence-transformers/all-MiniLM-L6-v2"
+        )
     )
-)
 
-vectorstore = Qdrant(
-    url=os.getenv("QDRANT_URL"),
-    api_key=os.getenv("QDRANT_API_KEY"),
-    collection_name=COLLECTION_NAME,
-    embedding=embeddings
+
+def _build_vectorstore():
+    # VECTOR_DB_TYPE=local serves retrieval from an in-process NumPy
+    # index loaded from a snapshot exported out of Qdrant.
+    if VECTOR_DB_TYPE == "local":
+        from .vector_index import LocalVectorIndex
+
+        return LocalVectorIndex.load(
+            LOCAL_VECTOR_SNAPSHOT_PATH,
+            embedding=embeddings.get(),
+            mmap=LOCAL_VECTOR_MMAP
+        )
+
+    from langchain.vectorstores import Qdrant
+
+    return Qdrant(
+        url=os.getenv("QDRANT_URL"),
+        api_key=os.getenv("QDRANT_API_KEY"),
+        collection_name=COLLECTION_NAME,
+        embedding=embeddings.get()
+    )
+
+
+embeddings = lazy("embeddings", _build_embeddings)
+vectorstore = lazy("vectorstore", _build_vectorstore)
+
+
+# Retrieval Cache
+# Query vectors depend only on the embedding model, so they survive
+# a re-index; retrieved documents do not. Document entries are keyed
+# on the host-wide index version, which invalidate_retrieval_cache()
+# bumps: the ingestion job reaches one worker, but every worker's
+# next lookup misses and goes to the re-indexed collection.
+index_version = SharedSnapshot(
+    os.path.join(SHARED_STATE_DIR, "insurance_index_version.json")
+)
+embedding_cache = TTLCache(
+    max_entries=RETRIEVAL_CACHE_SIZE,
+    ttl=RETRIEVAL_CACHE_TTL_SECONDS
 )
+document_cache = TTLCache(
+    max_entries=RETRIEVAL_CACHE_SIZE,
+    ttl=RETRIEVAL_CACHE_TTL_SECONDS
+)
+
+FILLER_WORDS = {
+    "um", "umm", "uh", "uhh", "hmm", "ah", "er",
+    "okay", "ok", "so", "like", "actually", "basically",
+    "please", "just", "well", "yeah", "ji", "haan",
+}
 
-retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical cache key for an ASR utterance: lowercase,
+    punctuation stripped, filler words removed.
+    """
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+async def embed_query(query: str) -> list:
+    """Embedding of the normalized query, cached across re-indexes."""
+    key = normalize_query(query)
+
+    vector = embedding_cache.get(key)
+    if vector is None:
+        with span("retriever.embed"):
+            vector = await embeddings.aembed_query(key)
+        embedding_cache.set(key, vector)
+    return vector
+
+
+def current_index_version() -> int:
+    """
+    Re-index counter shared by every worker: 0 before the first
+    invalidation, -1 if the snapshot cannot be read.
+    """
+    try:
+        return (index_version.read() or {}).get("version", 0)
+    except Exception as e:
+        print(">>> [RAG Node] Index version read failed:", str(e))
+        return -1
+
+
+async def retrieve(query: str) -> list:
+    key = (current_index_version(), normalize_query(query))
+
+    docs = document_cache.get(key)
+    if docs is not None:
+        RETRIEVAL_CACHE.inc(result="hit")
+        return docs
+    RETRIEVAL_CACHE.inc(result="miss")
+
+    vector = await embed_query(query)
+
+    with span("retriever.search", backend=VECTOR_DB_TYPE, k=RETRIEVAL_TOP_K) as current:
+        docs = await vectorstore.asimilarity_search_by_vector(vector, k=RETRIEVAL_TOP_K)
+        if current is not None:
+            current.set(documents=len(docs))
+    document_cache.set(key, docs)
+    return docs
+
+
+def invalidate_retrieval_cache() -> int:
+    """Call after the collection is re-indexed; returns the new index version."""
+    version = index_version.write({"invalidated_by": os.getpid()})
+    document_cache.clear()
+    print(f">>> [RAG Node] Retrieval cache invalidated (index version {version})")
+    return version
+
+
+def retrieval_cache_stats() -> dict:
+    return {
+        "embeddings": embedding_cache.stats(),
+        "documents": document_cache.stats(),
+        "index_version": current_index_version(),
+    }
 
 
 
 # RAG Node 
-def rag_node(state):
+@timed_node("rag_node")
+@traced("node.rag_node")
+async def rag_node(state):
     print(">>> [RAG Node] Running real document retrieval...")
 
     # 1️⃣ Get the last user message
@@ -44,13 +177,16 @@ def rag_node(state):
 
     print(f">>> [RAG Node] Query: {last_user_message}")
 
-    # 2️⃣ Run retrieval
+    # 2️⃣ Run retrieval (cached on the normalized query)
     try:
-        retrieved_docs = retriever.invoke(last_user_message)
+        retrieved_docs = await retrieve(last_user_message)
     except Exception as e:
         print(">>> [RAG Node] Retrieval error:", str(e))
+        RETRIEVALS.inc(outcome="error")
         return {"retrieved_info": ""}
 
+    RETRIEVALS.inc(outcome="documents" if retrieved_docs else "empty")
+
     # 3️⃣ Build merged retrieved document block
     merged_text = ""
 
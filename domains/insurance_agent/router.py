@@ -0,0 +1,162 @@
+import re
+import math
+from collections import Counter
+
+from config.settings import ENABLE_RAG
+from core.metrics import timed_node
+from core.tracing import traced
+
+
+# =========================
+# Retrieval gating rules
+# =========================
+# Most voice turns are acknowledgements or slot values (names,
+# dates, registration numbers). None of them need the knowledge
+# base, so they skip embedding + vector search entirely. A turn
+# that carries a value but also asks something ("is engine protect
+# available for MH12AB1234?") is a question, not a slot value, and
+# goes to the classifier.
+
+ACK_WORDS = {
+    "yes", "yeah", "yep", "yup", "no", "nope", "nah", "ok", "okay",
+    "sure", "fine", "right", "correct", "done", "thanks", "thank", "you",
+    "hello", "hi", "hey", "bye", "haan", "ha", "nahi", "ji", "theek",
+    "hai", "achha", "acha", "hmm", "umm", "uh", "please", "go", "ahead",
+    "alright", "great", "perfect", "got", "it", "that", "s", "its",
+}
+
+IDENTITY_PREFIXES = ("my name is", "this is", "i am", "i'm", "mera naam")
+
+# State code, RTO number, series letters, number: MH12AB1234, mh 12 ab 1234
+REGISTRATION_NUMBER = re.compile(r"\b[a-z]{2}[\s-]?\d{1,2}[\s-]?[a-z]{1,3}[\s-]?\d{4}\b")
+DATE_OR_NUMBER = re.compile(
+    r"^[\d\s/.,:-]+$"
+    r"|\b\d{1,2}(st|nd|rd|th)?\s+(of\s+)?"
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"
+)
+
+# =========================
+# Lightweight classifier
+# =========================
+# A tiny logistic scorer over hand-picked features. Cheap enough
+# to run on every turn; weights favour explicit questions about
+# policy terms over statements of fact.
+
+QUESTION_WORDS = {
+    "what", "how", "why", "which", "when", "where", "does", "do", "is",
+    "are", "can", "will", "should", "explain", "tell", "difference",
+    "mean", "meaning", "kya", "kaise", "kyun",
+}
+
+DOMAIN_TERMS = {
+    "claim", "claims", "cover", "covered", "coverage", "zero", "dep",
+    "depreciation", "idv", "ncb", "addon", "addons", "add", "engine",
+    "roadside", "assistance", "garage", "garages", "cashless", "premium",
+    "exclusion", "exclusions", "excluded", "policy", "third", "party",
+    "comprehensive", "theft", "accident", "deductible", "consumables",
+    "rti", "tyre", "renewal", "insurer", "settlement", "documents",
+    "waiting", "period", "transfer", "lapse", "lapsed", "inspection",
+}
+
+WEIGHTS = {
+    "bias": -2.3,
+    "question_word": 1.2,
+    "question_mark": 0.8,
+    "domain_term": 1.1,
+    "length": 0.6,
+}
+THRESHOLD = 0.5
+
+
+def retrieval_score(words: list, text: str) -> float:
+    features = {
+        "bias": 1.0,
+        "question_word": 1.0 if QUESTION_WORDS.intersection(words) else 0.0,
+        "question_mark": 1.0 if "?" in text else 0.0,
+        "domain_term": min(sum(1 for w in words if w in DOMAIN_TERMS), 3),
+        "length": min(len(words), 20) / 20,
+    }
+    z = sum(WEIGHTS[name] * value for name, value in features.items())
+    return 1 / (1 + math.exp(-z))
+
+
+def is_slot_value(words: list) -> bool:
+    """No question word and no policy term: a value, not a question."""
+    return not QUESTION_WORDS.intersection(words) and not DOMAIN_TERMS.intersection(words)
+
+
+def needs_retrieval(text: str):
+    """
+    Decides whether a user turn needs knowledge retrieval.
+    Returns (retrieve, reason, score).
+    """
+    if not ENABLE_RAG:
+        return False, "disabled", 0.0
+
+    lowered = (text or "").strip().lower()
+    words = re.findall(r"[a-z0-9]+", lowered)
+
+    if not words:
+        return False, "empty", 0.0
+    if all(w in ACK_WORDS for w in words):
+        return False, "acknowledgement", 0.0
+    if lowered.startswith(IDENTITY_PREFIXES):
+        prefix = next(p for p in IDENTITY_PREFIXES if lowered.startswith(p))
+        if is_slot_value(re.findall(r"[a-z0-9]+", lowered[len(prefix):])):
+            return False, "identity", 0.0
+    if REGISTRATION_NUMBER.search(lowered) or DATE_OR_NUMBER.search(lowered):
+        if is_slot_value(words):
+            return False, "entity", 0.0
+    if len(words) <= 2 and not DOMAIN_TERMS.intersection(words):
+        return False, "short", 0.0
+
+    score = retrieval_score(words, lowered)
+    return score >= THRESHOLD, "classifier", round(score, 3)
+
+
+# =========================
+# Router stats
+# =========================
+ROUTER_STATS = Counter()
+
+
+def router_stats() -> dict:
+    total = ROUTER_STATS["retrieve"] + ROUTER_STATS["skip"]
+    return {
+        "turns": total,
+        "retrieve": ROUTER_STATS["retrieve"],
+        "skip": ROUTER_STATS["skip"],
+        "skip_rate": round(ROUTER_STATS["skip"] / total, 4) if total else 0.0,
+        "reasons": {
+            key.split(":", 1)[1]: count
+            for key, count in ROUTER_STATS.items()
+            if key.startswith("reason:")
+        },
+    }
+
+
+# =========================
+# Router Node
+# =========================
+@timed_node("route_retrieval")
+@traced("node.route_retrieval")
+async def route_retrieval(state):
+    if state.get("prefetched"):
+        # Routed (and retrieved, if needed) during speculative prefetch
+        return {"retrieve": False}
+
+    last_user_message = next(
+        (
+            m.content for m in reversed(state.get("conversation", []))
+            if m.__class__.__name__ == "HumanMessage"
+        ),
+        ""
+    )
+
+    retrieve, reason, score = needs_retrieval(last_user_message)
+
+    ROUTER_STATS["retrieve" if retrieve else "skip"] += 1
+    ROUTER_STATS[f"reason:{reason}"] += 1
+    print(f">>> [Router] retrieve={retrieve} reason={reason} score={score}")
+
+    return {"retrieve": retrieve, "retrieved_info": ""}
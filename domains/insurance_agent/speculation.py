@@ -0,0 +1,167 @@
+import re
+import time
+import asyncio
+from difflib import SequenceMatcher
+
+from langchain_core.messages import HumanMessage
+
+
+def normalize_transcript(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+
+# =========================
+# Speculation
+# =========================
+class Speculation:
+    """
+    Work started on an ASR partial transcript: a retrieval task
+    and, for stable partials, an optional generation task.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.normalized = normalize_transcript(text)
+        self.created_at = time.monotonic()
+        self.retrieval = None
+        self.generation = None
+
+    def cancel(self):
+        for task in (self.retrieval, self.generation):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+# =========================
+# Speculative Prefetcher
+# =========================
+class SpeculativePrefetcher:
+    """
+    Runs retrieval (and optionally generation) on ASR partials
+    while the caller is still speaking.
+
+    `retrieve(state)` returns the router/RAG state update;
+    `generate(state)` returns the raw model output for the turn.
+    The final /chat turn claims the speculation: retrieval is
+    reused when the final transcript is within `threshold`
+    similarity of the partial, generation only on an exact
+    (normalized) match. Anything else is cancelled.
+    """
+
+    def __init__(self, retrieve, generate=None, threshold: float = 0.9, max_age: float = 30):
+        self._retrieve = retrieve
+        self._generate = generate
+        self.threshold = threshold
+        self.max_age = max_age
+        self._speculations = {}
+        self.stats = {
+            "started": 0, "reused": 0, "generation_reused": 0,
+            "cancelled": 0, "failed": 0, "generation_failed": 0,
+        }
+
+    def submit(self, session_id: str, conversation: list, partial: str, stable: bool = False):
+        self._purge()
+
+        current = self._speculations.get(session_id)
+        if current is not None and current.normalized == normalize_transcript(partial):
+            if stable and current.generation is None:
+                current.generation = self._start_generation(session_id, conversation, current)
+            return current
+
+        if current is not None:
+            current.cancel()
+            self.stats["cancelled"] += 1
+
+        speculation = Speculation(partial)
+        state = self._state(session_id, conversation, partial)
+        speculation.retrieval = asyncio.create_task(self._retrieve(state))
+        if stable:
+            speculation.generation = self._start_generation(session_id, conversation, speculation)
+
+        self._speculations[session_id] = speculation
+        self.stats["started"] += 1
+        return speculation
+
+    async def claim(self, session_id: str, final_text: str) -> dict:
+        """
+        Returns a state update to merge into the final turn,
+        or {} if nothing reusable was prefetched.
+        """
+        speculation = self._speculations.pop(session_id, None)
+        if speculation is None:
+            return {}
+
+        final = normalize_transcript(final_text)
+        similarity = SequenceMatcher(None, speculation.normalized, final).ratio()
+
+        if similarity < self.threshold:
+            speculation.cancel()
+            self.stats["cancelled"] += 1
+            return {}
+
+        update = {}
+        try:
+            update.update(await speculation.retrieval)
+            update["prefetched"] = True
+        except Exception as e:
+            print(">>> [Speculation] Prefetch failed:", str(e))
+            speculation.cancel()
+            self.stats["failed"] += 1
+            return {}
+
+        if speculation.generation is not None:
+            if speculation.normalized == final:
+                try:
+                    update["prefetched_response"] = await speculation.generation
+                    self.stats["generation_reused"] += 1
+                except Exception as e:
+                    # The retrieval is still good; the turn only generates again
+                    print(">>> [Speculation] Speculative generation failed:", str(e))
+                    self.stats["generation_failed"] += 1
+            else:
+                speculation.generation.cancel()
+
+        self.stats["reused"] += 1
+        print(f">>> [Speculation] Reused prefetch (similarity={similarity:.2f})")
+        return update
+
+    def stats_snapshot(self) -> dict:
+        claimed = self.stats["reused"] + self.stats["cancelled"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "pending": len(self._speculations),
+            "reuse_rate": round(self.stats["reused"] / claimed, 4) if claimed else 0.0,
+        }
+
+    def discard(self, session_id: str):
+        speculation = self._speculations.pop(session_id, None)
+        if speculation is not None:
+            speculation.cancel()
+
+    def _start_generation(self, session_id, conversation, speculation):
+        if self._generate is None:
+            return None
+
+        async def _run():
+            state = self._state(session_id, conversation, speculation.text)
+            state.update(await speculation.retrieval)
+            return await self._generate(state)
+
+        return asyncio.create_task(_run())
+
+    @staticmethod
+    def _state(session_id: str, conversation: list, text: str) -> dict:
+        # Snapshot: speculation never mutates the live conversation
+        return {
+            "session_id": session_id,
+            "conversation": list(conversation) + [HumanMessage(content=text)],
+            "retrieve": False,
+            "retrieved_info": "",
+        }
+
+    def _purge(self):
+        now = time.monotonic()
+        for session_id, speculation in list(self._speculations.items()):
+            if now - speculation.created_at > self.max_age:
+                speculation.cancel()
+                del self._speculations[session_id]
@@ -0,0 +1,167 @@
+import os
+import json
+import argparse
+
+import numpy as np
+from langchain.schema import Document
+
+
+# =========================
+# Snapshot layout
+# =========================
+# <snapshot_dir>/vectors.npy      float32 [n, dim], L2-normalized rows
+# <snapshot_dir>/documents.jsonl  one {"page_content", "metadata"} per row
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# =========================
+# Local Vector Index
+# =========================
+class LocalVectorIndex:
+    """
+    In-process cosine-similarity index over a NumPy matrix.
+
+    Drop-in for the subset of the Qdrant vectorstore API that
+    rag.py uses, so a few thousand chunks can be searched without
+    a network round trip or any external service.
+    """
+
+    def __init__(self, vectors: np.ndarray, documents: list, embedding=None):
+        if len(vectors) != len(documents):
+            raise ValueError(
+                f"Snapshot mismatch: {len(vectors)} vectors, {len(documents)} documents"
+            )
+
+        self.vectors = vectors
+        self.documents = documents
+        self.embedding = embedding
+
+    @classmethod
+    def load(cls, path: str, embedding=None, mmap: bool = False):
+        vectors = np.load(
+            os.path.join(path, VECTORS_FILE),
+            mmap_mode="r" if mmap else None
+        )
+        if not mmap:
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        documents = []
+        with open(os.path.join(path, DOCUMENTS_FILE), encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                documents.append(
+                    Document(
+                        page_content=row["page_content"],
+                        metadata=row.get("metadata") or {}
+                    )
+                )
+
+        print(f">>> [Vector Index] Loaded {len(documents)} chunks from {path}")
+        return cls(vectors, documents, embedding)
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(
+            os.path.join(path, VECTORS_FILE),
+            _normalize(np.asarray(self.vectors, dtype=np.float32))
+        )
+        with open(os.path.join(path, DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+            for doc in self.documents:
+                f.write(json.dumps(
+                    {"page_content": doc.page_content, "metadata": doc.metadata},
+                    ensure_ascii=False
+                ) + "\n")
+
+    def search(self, vector, k: int = 5) -> list:
+        """Returns [(Document, cosine score)] for the top-k rows."""
+        if not self.documents:
+            return []
+
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = self.vectors @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding, k: int = 5, **kwargs) -> list:
+        return [doc for doc, _ in self.search(embedding, k)]
+
+    async def asimilarity_search_by_vector(self, embedding, k: int = 5, **kwargs) -> list:
+        # A matrix-vector product over a few thousand rows is
+        # sub-millisecond; not worth a thread hop.
+        return self.similarity_search_by_vector(embedding, k)
+
+    def similarity_search(self, query: str, k: int = 5, **kwargs) -> list:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+
+# =========================
+# Qdrant snapshot export
+# =========================
+def export_qdrant_snapshot(url: str, api_key: str, collection: str, path: str, batch_size: int = 256):
+    """
+    Scrolls every point (with its vector) out of a Qdrant collection
+    written by langchain and saves it as a local snapshot.
+    """
+    from qdrant_client import QdrantClient
+
+    client = QdrantClient(url=url, api_key=api_key)
+
+    vectors = []
+    documents = []
+    offset = None
+
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+
+        for point in points:
+            payload = point.payload or {}
+            vectors.append(point.vector)
+            documents.append(
+                Document(
+                    page_content=payload.get("page_content", ""),
+                    metadata=payload.get("metadata") or {}
+                )
+            )
+
+        if offset is None:
+            break
+
+    index = LocalVectorIndex(np.asarray(vectors, dtype=np.float32), documents)
+    index.save(path)
+    print(f"✅ Exported {len(documents)} points from '{collection}' to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export a Qdrant collection to a local vector index snapshot"
+    )
+    parser.add_argument("--out", required=True, help="Snapshot directory")
+    parser.add_argument(
+        "--collection",
+        default=os.getenv("VECTOR_COLLECTION_NAME", "insurance_docs")
+    )
+    args = parser.parse_args()
+
+    export_qdrant_snapshot(
+        os.getenv("QDRANT_URL"),
+        os.getenv("QDRANT_API_KEY"),
+        args.collection,
+        args.out
+    )
@@ -1,31 +1,73 @@
-import os
 import re
-import json
 import time
-from datetime import datetime
+import threading
 from uuid import uuid4
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
-from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
 from typing_extensions import TypedDict
 
-from .prompt import SYSTEM_PROMPT
+from .prompt import SYSTEM_PROMPT, OPENING_TEMPLATES
+from config.settings import (
+    SESSION_MAX_ENTRIES,
+    SESSION_IDLE_TTL_SECONDS,
+    SUMMARY_WORKERS,
+    SUMMARY_QUEUE_SIZE,
+    SUMMARY_RESULT_RETENTION,
+    SUMMARY_WEBHOOK_URL,
+    CONTEXT_KEEP_TURNS,
+    CONTEXT_FOLD_BATCH_TURNS,
+    LLM_PREWARM,
+    LLM_PREWARM_CONNECTIONS,
+    STARTUP_WARMUP,
+    READY_REQUIRES_WARM,
+    ENABLE_OPENING_TURN,
+)
+from core.lazy import lazy, readiness, warm_up
+from core.metrics import (
+    timed_node,
+    record_usage,
+    render_prometheus,
+    metrics_snapshot,
+    PROMETHEUS_CONTENT_TYPE,
+    TURN_LATENCY,
+    NODE_LATENCY,
+    LLM_LATENCY,
+    LLM_TTFT,
+    TURNS,
+    OPENING_TURNS,
+)
+from core.llm_clients import get_llm, prewarm
+from core.context_window import ContextWindow
+from core.contract import parse_contract, bind_contract
+from core.prompt_builder import PromptBuilder
+from core.opening_turn import OpeningTurn
+from core.session_store import SessionStore
+from core.tracing import begin_trace, span, traced, trace_stream
+from core.streaming import ContractStreamParser, sse_event
+from core.summary_jobs import SummaryJobQueue
 
 
 # =========================
-# LLM Configuration
+# LLM Clients (shared pool, see core/llm_clients.py)
 # =========================
-llm = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_DEPLOYMENT_NAME"),
-    openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    max_tokens=90
-)
+# Built on first use or by the background warm-up, see core/lazy.py
+llm = lazy("llm.chat", lambda: bind_contract(get_llm("chat")))
+llm_summary = lazy("llm.summary", lambda: get_llm("summary"))
+
+
+def _warm():
+    if STARTUP_WARMUP:
+        warm_up()
+    if LLM_PREWARM:
+        prewarm(LLM_PREWARM_CONNECTIONS)
+
+
+# Off the import path; the worker accepts traffic meanwhile
+threading.Thread(target=_warm, daemon=True).start()
 
 
 # =========================
@@ -35,50 +77,112 @@ app = Flask(__name__)
 CORS(app)
 
 
+# =========================
+# System Prompt
+# =========================
+# Compiled once: the static prefix is byte-identical for every
+# call; name and time of day go in a trailing message.
+prompt_builder = PromptBuilder(SYSTEM_PROMPT)
+
+# Scripted greeting served without the LLM when the call opens with "Hello?"
+opening_turn = OpeningTurn(OPENING_TEMPLATES)
+
+
+# =========================
+# Rolling Context Window
+# =========================
+context_window = ContextWindow(
+    llm_summary,
+    keep_turns=CONTEXT_KEEP_TURNS,
+    fold_batch_turns=CONTEXT_FOLD_BATCH_TURNS
+)
+
+
+# =========================
+# Session Store
+# =========================
+sessions = SessionStore(
+    max_sessions=SESSION_MAX_ENTRIES,
+    idle_ttl=SESSION_IDLE_TTL_SECONDS
+)
+
+
 # =========================
 # LangGraph State
 # =========================
 class State(TypedDict):
+    session_id: str
     conversation: list
     call_status: str
     language: str
     summary: str
+    summary_job_id: str
+    opening_response: str
 
 
 # =========================
 # Helpers
 # =========================
-def get_system_message(name: str):
-    hour = datetime.now().hour
-    return SystemMessage(
-        content=(
-            SYSTEM_PROMPT
-            .replace("Name", name)
-            .replace("{current_hour}", str(hour))
-        )
-    )
+def get_system_messages(name: str) -> list:
+    return prompt_builder.messages(name)
 
 
+def opening_response(conversation: list, name: str, user_message: str):
+    """Pre-rendered greeting if the call opens with a plain hello, else None."""
+    if not ENABLE_OPENING_TURN:
+        return None
+    reply = opening_turn.reply(conversation, name, user_message)
+    if reply is not None:
+        OPENING_TURNS.inc()
+    return reply
+
+
+def generate_reply(state: State) -> str:
+    with span("llm.invoke", role="chat") as current, LLM_LATENCY.time(mode="invoke"):
+        response = llm.invoke(
+            context_window.build(state["session_id"], state["conversation"])
+        )
+        if current is not None:
+            current.set(**(getattr(response, "usage_metadata", None) or {}))
+    record_usage(response)
+    return response.content
+
+
+def stream_reply(session_id: str, conversation: list, opening: str = None):
+    if opening is not None:
+        yield opening
+        return
+
+    with span("llm.stream", role="chat") as current:
+        messages = context_window.build(session_id, conversation)
+        llm_start = time.perf_counter()
+        first = True
+        for chunk in llm.stream(messages):
+            if first:
+                LLM_TTFT.observe(time.perf_counter() - llm_start)
+                if current is not None:
+                    current.set(ttft_ms=round((time.perf_counter() - llm_start) * 1000, 1))
+                first = False
+            # With stream_usage the last chunk carries the token counts
+            record_usage(chunk)
+            if current is not None and getattr(chunk, "usage_metadata", None):
+                current.set(**chunk.usage_metadata)
+            yield chunk.content
+        LLM_LATENCY.observe(time.perf_counter() - llm_start, mode="stream")
+
+
+@timed_node("llm_call")
+@traced("node.llm_call")
 def llm_call(state: State):
     conversation = state["conversation"]
 
-    start = time.time()
-    response = llm.invoke(conversation)
-    print(f"Lending LLM latency: {time.time() - start:.2f}s")
+    content = state.get("opening_response")
+    if content is None:
+        content = generate_reply(state)
 
-    conversation.append(AIMessage(content=response.content))
+    conversation.append(AIMessage(content=content))
 
-    match = re.search(r'\{.*"call_status".*\}', response.content)
-    call_status = "ONGOING"
-    language = None
-
-    if match:
-        try:
-            payload = json.loads(match.group())
-            call_status = payload.get("call_status", "ONGOING")
-            language = payload.get("language")
-        except Exception:
-            pass
+    _, call_status, language = parse_contract(content)
 
     return {
         "conversation": conversation,
@@ -88,9 +192,11 @@ def llm_call(state: State):
     }
 
 
-def summarize_conversation(state: State):
-    conversation = state["conversation"]
-
+def summarize_transcript(conversation: list) -> str:
+    """
+    Runs on a summary worker thread, off the request path.
+    Returns the post-call summary as a JSON string.
+    """
     summary_prompt = """
 You are an assistant that summarizes call conversations for reporting.
 
@@ -159,22 +265,46 @@ Return ONLY valid JSON. No explanation. No markdown.
         if not isinstance(m, SystemMessage)
     )
 
-    response = llm.invoke([HumanMessage(content=summary_prompt + convo)])
+    response = llm_summary.invoke([HumanMessage(content=summary_prompt + convo)])
 
     summary_text = response.content.strip()
     summary_text = re.sub(r"^```json\s*|\s*```$", "", summary_text)
 
     match = re.search(r"\{[\s\S]*\}", summary_text)
-    summary_json = match.group() if match else "{}"
+    return match.group() if match else "{}"
+
+
+@timed_node("summarize_conversation")
+@traced("node.summarize_conversation")
+def summarize_conversation(state: State):
+    """
+    Hands the finished call to the background summary pool.
+    The summary is fetched later via GET /summary/<session_id>
+    or delivered to SUMMARY_WEBHOOK_URL.
+    """
+    job_id = summary_jobs.submit(state["session_id"], state["conversation"])
 
     return {
-        "conversation": conversation,
+        "conversation": state["conversation"],
         "call_status": "END",
         "language": state.get("language"),
-        "summary": summary_json
+        "summary": None,
+        "summary_job_id": job_id
     }
 
 
+# =========================
+# Post-call Summary Queue
+# =========================
+summary_jobs = SummaryJobQueue(
+    summarize_transcript,
+    workers=SUMMARY_WORKERS,
+    max_pending=SUMMARY_QUEUE_SIZE,
+    max_results=SUMMARY_RESULT_RETENTION,
+    webhook_url=SUMMARY_WEBHOOK_URL
+)
+
+
 # =========================
 # LangGraph Workflow
 # =========================
@@ -199,48 +329,197 @@ workflow.add_edge("summarize_conversation", END)
 graph_app = workflow.compile()
 
 
+# =========================
+# Streaming turn
+# =========================
+def stream_chat(session, session_id: str, user_name: str, user_message: str):
+    """
+    Runs one turn with token streaming and yields SSE events:
+    sentence-sized `chunk` events as soon as they are complete,
+    then a single `done` event carrying the call_status contract.
+    """
+    turn_start_time = time.perf_counter()
+    with session.lock:
+        conversation = session.conversation
+        turn_start = len(conversation)
+        conversation.append(HumanMessage(content=user_message))
+
+        try:
+            parser = ContractStreamParser()
+
+            opening = opening_response(conversation, user_name, user_message)
+            with NODE_LATENCY.time(node="llm_call"):
+                for token in stream_reply(session_id, conversation, opening):
+                    for sentence in parser.feed(token):
+                        yield sse_event({"type": "chunk", "text": sentence})
+                for sentence in parser.finish():
+                    yield sse_event({"type": "chunk", "text": sentence})
+
+            conversation.append(AIMessage(content=parser.text))
+
+            result = {
+                "session_id": session_id,
+                "conversation": conversation,
+                "call_status": parser.call_status,
+                "language": parser.language,
+                "summary": None,
+                "summary_job_id": None
+            }
+            if parser.call_status == "END":
+                result = summarize_conversation(result)
+        except BaseException:
+            # Also covers the client hanging up mid-stream
+            del conversation[turn_start:]
+            raise
+
+        session.call_status = result.get("call_status")
+        session.language = result.get("language") or session.language
+
+    if session.call_status == "END":
+        sessions.discard(session_id)
+        context_window.discard(session_id)
+
+    TURN_LATENCY.observe(time.perf_counter() - turn_start_time, mode="stream")
+    TURNS.inc(call_status=session.call_status)
+
+    yield sse_event({
+        "type": "done",
+        "session_id": session_id,
+        "call_status": result.get("call_status"),
+        "language": result.get("language"),
+        "summary": result.get("summary"),
+        "summary_job_id": result.get("summary_job_id")
+    })
+
+
 # =========================
 # API Endpoint
 # =========================
 @app.route("/chat", methods=["POST"])
 def chat():
-    data = request.get_json()
+    # Trace context comes from the telephony side's traceparent /
+    # X-Trace-Id header and is echoed back on the response
+    trace = begin_trace("chat", request.headers, agent="lending")
+    try:
+        with trace.activate():
+            response = app.make_response(handle_chat(trace))
+    except BaseException as e:
+        trace.finish(e)
+        raise
+
+    response.headers.update(trace.response_headers())
+    if not response.is_streamed:
+        # Streamed turns finish their trace when the stream ends
+        trace.finish(status_code=response.status_code)
+    return response
+
+
+def handle_chat(trace):
+    with span("request.parse"):
+        data = request.get_json()
 
     user_id = data.get("user_id")
     user_name = data.get("name", "Customer")
     user_message = data.get("message")
-    conversation = data.get("conversation", [])
     call_status = data.get("call_status", "ONGOING")
 
     if not user_id or not user_message:
         return jsonify({"error": "Missing user_id or message"}), 400
 
-    if not conversation:
-        conversation = [get_system_message(user_name)]
+    session_id = data.get("session_id") or str(uuid4())
+    trace.set(session_id=session_id, stream=bool(data.get("stream")))
 
-    conversation.append(HumanMessage(content=user_message))
+    # Conversation lives server-side; a client-supplied conversation
+    # is only used to seed a session the store has never seen.
+    session = sessions.get_or_create(
+        session_id,
+        lambda: data.get("conversation") or get_system_messages(user_name)
+    )
 
-    state = {
-        "conversation": conversation,
-        "call_status": call_status,
-        "language": None,
-        "summary": None
-    }
+    if data.get("stream"):
+        return Response(
+            trace_stream(trace, stream_chat(session, session_id, user_name, user_message)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    turn_start_time = time.perf_counter()
+    with session.lock:
+        conversation = session.conversation
+        turn_start = len(conversation)
+        conversation.append(HumanMessage(content=user_message))
+
+        state = {
+            "session_id": session_id,
+            "conversation": conversation,
+            "call_status": call_status,
+            "language": None,
+            "summary": None,
+            "summary_job_id": None,
+            "opening_response": opening_response(conversation, user_name, user_message)
+        }
+
+        try:
+            result = graph_app.invoke(state)
+        except Exception:
+            # Roll back the partial turn so a retry does not duplicate it
+            del conversation[turn_start:]
+            raise
 
-    result = graph_app.invoke(state)
+        session.call_status = result.get("call_status")
+        session.language = result.get("language") or session.language
 
+    if session.call_status == "END":
+        sessions.discard(session_id)
+        context_window.discard(session_id)
+
+    TURN_LATENCY.observe(time.perf_counter() - turn_start_time, mode="json")
+    TURNS.inc(call_status=session.call_status)
+
+    # Only this turn's reply is returned, never the history
     last_agent_msg = next(
-        (m for m in reversed(result["conversation"]) if isinstance(m, AIMessage)),
+        (
+            m for m in reversed(result["conversation"][turn_start:])
+            if isinstance(m, AIMessage)
+        ),
         None
     )
 
-    agent_text = last_agent_msg.content if last_agent_msg else ""
-    agent_text = re.sub(r'\{.*"call_status".*\}$', '', agent_text).strip()
+    agent_text, _, _ = parse_contract(last_agent_msg.content if last_agent_msg else "")
 
-    return jsonify({
-        "agent": agent_text,
-        "call_status": result.get("call_status"),
-        "language": result.get("language"),
-        "summary": result.get("summary"),
-        "conversation": result.get("conversation")
-    })
+    trace.set(call_status=result.get("call_status"))
+    with span("response.serialize"):
+        return jsonify({
+            "session_id": session_id,
+            "agent": agent_text,
+            "call_status": result.get("call_status"),
+            "language": result.get("language"),
+            "summary": result.get("summary"),
+            "summary_job_id": result.get("summary_job_id")
+        })
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    # Prometheus text format; ?format=json adds p50/p90/p99 estimates
+    if request.args.get("format") == "json":
+        return jsonify(metrics_snapshot())
+    return Response(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.route("/ready", methods=["GET"])
+def get_ready():
+    components = readiness()
+    warm = all(component["ready"] for component in components.values())
+    ready = warm or not READY_REQUIRES_WARM
+    return jsonify({"ready": ready, "warm": warm, "components": components}), 200 if ready else 503
+
+
+@app.route("/summary/<session_id>", methods=["GET"])
+def get_summary(session_id):
+    job = summary_jobs.get(session_id)
+
+    if job is None:
+        return jsonify({"error": "No summary job for session"}), 404
+
+    return jsonify(job)
@@ -66,3 +66,41 @@ At the end of every response, output a JSON object on a new line:
 Do not explain the JSON.
 Do not wrap it in markdown.
 """
+
+
+# Pre-rendered first reply (core/opening_turn.py): greeting, identity
+# confirmation and purpose, in the caller's language.
+OPENING_TEMPLATES = {
+    "English": {
+        "named": (
+            "{salutation}, am I speaking with {name}? "
+            "I'm calling from the loan assistance team about your recent loan inquiry."
+        ),
+        "anonymous": (
+            "{salutation}, I'm calling from the loan assistance team about your recent loan inquiry. "
+            "Is this a good time to talk?"
+        ),
+        "salutations": {
+            "morning": "Good morning",
+            "afternoon": "Good afternoon",
+            "evening": "Good evening",
+            "night": "Hello",
+        },
+    },
+    "Hindi": {
+        "named": (
+            "{salutation}, क्या मेरी बात {name} जी से हो रही है? "
+            "यह कॉल आपकी हाल की लोन पूछताछ के बारे में लोन सहायता टीम की ओर से है।"
+        ),
+        "anonymous": (
+            "{salutation}, यह कॉल आपकी हाल की लोन पूछताछ के बारे में लोन सहायता टीम की ओर से है। "
+            "क्या अभी बात करने का सही समय है?"
+        ),
+        "salutations": {
+            "morning": "नमस्ते",
+            "afternoon": "नमस्ते",
+            "evening": "नमस्ते",
+            "night": "नमस्ते",
+        },
+    },
+}